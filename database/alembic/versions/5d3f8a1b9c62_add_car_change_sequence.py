@@ -0,0 +1,40 @@
+"""add car change sequence
+
+Revision ID: 5d3f8a1b9c62
+Revises: 1a6c0f9e8b47
+Create Date: 2026-10-19 19:02:13.418265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d3f8a1b9c62'
+down_revision: Union[str, None] = '1a6c0f9e8b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('car_change_sequence',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('last_seq', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Continue after the sequence numbers already handed out by AUTO_INCREMENT
+    op.execute("INSERT INTO car_change_sequence (id, last_seq) SELECT 1, COALESCE(MAX(seq), 0) FROM car_changes")
+    op.alter_column('car_changes', 'seq',
+               existing_type=sa.Integer(),
+               autoincrement=False,
+               existing_nullable=False)
+
+
+def downgrade() -> None:
+    op.alter_column('car_changes', 'seq',
+               existing_type=sa.Integer(),
+               autoincrement=True,
+               existing_nullable=False)
+    op.drop_table('car_change_sequence')
@@ -0,0 +1,28 @@
+"""add car search version
+
+Revision ID: c7a4e1d9b305
+Revises: 9e2b7c4d1f38
+Create Date: 2026-10-19 21:14:06.530981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a4e1d9b305'
+down_revision: Union[str, None] = '9e2b7c4d1f38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('car_search', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+    op.execute("UPDATE car_search SET version = (SELECT cars.version FROM cars WHERE cars.id = car_search.car_id)")
+    op.alter_column('car_search', 'version', existing_type=sa.Integer(), existing_nullable=False, server_default=None)
+
+
+def downgrade() -> None:
+    op.drop_column('car_search', 'version')
@@ -0,0 +1,94 @@
+import argparse
+import time
+from typing import Dict, Iterable, List
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from database.car_changes import record_car_changes
+from database.car_search import refresh_car_search
+from database.config import get_db
+from database.models import ArchivedCar, Car, ChangeOperation, ARCHIVED_CAR_COLUMNS
+
+
+def restore_archived_cars(session: Session, external_ids: Iterable[str]) -> List[int]:
+    """
+    Move the archived cars with the given external ids back to the cars table,
+    keeping their ids, in the caller's transaction.
+
+    Returns:
+        list: IDs of the restored cars
+    """
+    archive = ArchivedCar.__table__
+    car_ids = session.execute(
+        select(archive.c.id).where(archive.c.external_id.in_(list(external_ids)))
+    ).scalars().all()
+    if not car_ids:
+        return []
+
+    session.execute(
+        insert(Car.__table__).from_select(
+            ARCHIVED_CAR_COLUMNS,
+            select(*[archive.c[name] for name in ARCHIVED_CAR_COLUMNS]).where(archive.c.id.in_(car_ids))
+        )
+    )
+    session.execute(delete(archive).where(archive.c.id.in_(car_ids)))
+    return car_ids
+
+
+def archive_cars(before_year: int, chunk_size: int = 5000) -> Dict[str, int]:
+    """
+    Move the cars older than before_year from the cars table to cars_archive,
+    committing every chunk_size cars. Read tools only query the cars table
+    unless asked to include the archive.
+
+    Returns:
+        dict: Number of cars archived
+    """
+    cars = Car.__table__
+    archived = 0
+    db = get_db()
+
+    try:
+        while True:
+            car_ids = db.execute(
+                select(cars.c.id).where(cars.c.year < before_year).order_by(cars.c.id).limit(chunk_size)
+            ).scalars().all()
+            if not car_ids:
+                break
+
+            db.execute(
+                insert(ArchivedCar.__table__).from_select(
+                    ARCHIVED_CAR_COLUMNS,
+                    select(*[cars.c[name] for name in ARCHIVED_CAR_COLUMNS]).where(cars.c.id.in_(car_ids))
+                )
+            )
+            db.execute(delete(cars).where(cars.c.id.in_(car_ids)))
+            refresh_car_search(db, car_ids)
+            record_car_changes(db, [(car_id, ChangeOperation.ARCHIVE) for car_id in car_ids])
+            db.commit()
+            archived += len(car_ids)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    return {"archived": archived}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move old cars to the archive table")
+    parser.add_argument("--before-year", type=int, required=True, help="Archive cars with a year older than this one")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Cars moved per transaction")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    stats = archive_cars(args.before_year, args.chunk_size)
+    elapsed = time.perf_counter() - started
+
+    print(f"Archived {stats['archived']} cars older than {args.before_year} in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
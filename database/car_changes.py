@@ -0,0 +1,51 @@
+from typing import Iterable, Tuple
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from database.models import CarChange, CarChangeSequence, ChangeOperation
+
+
+def record_car_changes(session: Session, changes: Iterable[Tuple[int, ChangeOperation]]) -> None:
+    """
+    Append changes to the car change log in the caller's transaction, so they are
+    committed together with the write.
+
+    Sequence numbers are taken from the car_change_sequence row, which stays
+    locked until the caller's transaction ends. Writers therefore commit their
+    changes one after the other in sequence order, and once a reader has seen a
+    sequence number no change with a lower one can appear later. Callers should
+    record their changes as the last step before committing to hold the lock as
+    briefly as possible.
+
+    On MySQL the sequence is advanced and read back in one UPDATE through
+    LAST_INSERT_ID(expr), whose value is kept per connection, instead of a locking
+    SELECT followed by the UPDATE.
+
+    Args:
+        session (Session): Session performing the write
+        changes (iterable): Tuples of the changed car ID and the kind of change
+    """
+    changes = list(changes)
+    if not changes:
+        return
+
+    if session.get_bind().dialect.name in ("mysql", "mariadb"):
+        result = session.execute(
+            update(CarChangeSequence)
+            .where(CarChangeSequence.id == 1)
+            .values(last_seq=func.last_insert_id(CarChangeSequence.last_seq + len(changes)))
+        )
+        # The statement's last insert id is the new value, read without another query
+        last_seq = result.lastrowid - len(changes)
+    else:
+        last_seq = session.execute(
+            select(CarChangeSequence.last_seq).where(CarChangeSequence.id == 1).with_for_update()
+        ).scalar_one()
+        session.execute(
+            update(CarChangeSequence).where(CarChangeSequence.id == 1).values(last_seq=last_seq + len(changes))
+        )
+    session.execute(insert(CarChange), [
+        {'seq': seq, 'car_id': car_id, 'operation': operation}
+        for seq, (car_id, operation) in enumerate(changes, start=last_seq + 1)
+    ])
@@ -0,0 +1,183 @@
+import argparse
+import random
+import statistics
+import time
+from typing import Iterable
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session, contains_eager
+
+from database.config import get_db
+from database.models import Brand, Car, CarSearch, FuelType, Model
+
+CAR_SEARCH_SOURCE_COLUMNS = {
+    'car_id': Car.id,
+    'year': Car.year,
+    'color': Car.color,
+    'kilometers': Car.kilometers,
+    'doors': Car.doors,
+    'accents': Car.accents,
+    'price': Car.price,
+    'description': Car.description,
+    'version': Car.version,
+    'model_id': Model.id,
+    'model_name': Model.name,
+    'engine_displacement': Model.engine_displacement,
+    'fuel_type': Model.fuel_type,
+    'consumption': Model.consumption,
+    'transmission': Model.transmission,
+    'brand_id': Brand.id,
+    'brand_name': Brand.name,
+}
+
+
+def car_search_source():
+    """Select the car_search rows from the cars, models and brands tables."""
+    return (
+        select(*CAR_SEARCH_SOURCE_COLUMNS.values())
+        .join(Model, Car.model_id == Model.id)
+        .join(Brand, Model.brand_id == Brand.id)
+    )
+
+
+def refresh_car_search(session: Session, car_ids: Iterable[int]) -> None:
+    """
+    Rewrite the car_search rows of the given cars from their current state, in
+    the caller's transaction. Rows of cars that no longer exist are removed.
+    """
+    car_ids = list(car_ids)
+    if not car_ids:
+        return
+
+    session.execute(delete(CarSearch).where(CarSearch.car_id.in_(car_ids)))
+    session.execute(
+        insert(CarSearch.__table__).from_select(
+            list(CAR_SEARCH_SOURCE_COLUMNS),
+            car_search_source().where(Car.id.in_(car_ids))
+        )
+    )
+
+
+def rebuild_car_search(chunk_size: int = 50000) -> int:
+    """
+    Rebuild the whole car_search table in a single transaction, copying the cars
+    by id range.
+
+    Returns:
+        int: Number of rows written
+    """
+    db = get_db()
+
+    try:
+        db.execute(delete(CarSearch))
+
+        min_id, max_id = db.execute(select(func.min(Car.id), func.max(Car.id))).one()
+        if min_id is not None:
+            for start in range(min_id, max_id + 1, chunk_size):
+                db.execute(
+                    insert(CarSearch.__table__).from_select(
+                        list(CAR_SEARCH_SOURCE_COLUMNS),
+                        car_search_source().where(Car.id.between(start, start + chunk_size - 1))
+                    )
+                )
+
+        total = db.execute(select(func.count(CarSearch.car_id))).scalar()
+        db.commit()
+        return total
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def benchmark(queries: int = 200, seed: int = 0) -> None:
+    """
+    Time random filters and a count by brand against the joined tables and
+    against car_search, printing the median and p95 latency of each. Filters
+    load their rows as the read tools do: cars with their model and brand
+    through the joins, or whole car_search rows.
+    """
+    db = get_db()
+    rng = random.Random(seed)
+
+    try:
+        brand_names = db.execute(select(Brand.name)).scalars().all()
+        total = db.execute(select(func.count(CarSearch.car_id))).scalar()
+        print(f"Benchmarking {queries} queries over {total} cars")
+
+        filters = []
+        for _ in range(queries):
+            min_price = rng.uniform(30000, 150000)
+            filters.append({
+                'brand_name': rng.choice(brand_names),
+                'fuel_type': rng.choice(list(FuelType)),
+                'min_price': min_price,
+                'max_price': min_price + 50000,
+                'min_year': rng.randint(2001, 2020),
+            })
+
+        def joined(f):
+            return select(Car).join(Car.model).join(Model.brand).options(contains_eager(Car.model).contains_eager(Model.brand)).where(
+                Brand.name == f['brand_name'],
+                Model.fuel_type == f['fuel_type'],
+                Car.price.between(f['min_price'], f['max_price']),
+                Car.year >= f['min_year']
+            )
+
+        def flat(f):
+            return select(*CarSearch.__table__.columns).where(
+                CarSearch.brand_name == f['brand_name'],
+                CarSearch.fuel_type == f['fuel_type'],
+                CarSearch.price.between(f['min_price'], f['max_price']),
+                CarSearch.year >= f['min_year']
+            )
+
+        count_queries = {
+            "count by brand (join)": select(Brand.name, func.count(Car.id)).select_from(Car).join(Model, Car.model_id == Model.id).join(Brand, Model.brand_id == Brand.id).group_by(Brand.name),
+            "count by brand (car_search)": select(CarSearch.brand_name, func.count(CarSearch.car_id)).group_by(CarSearch.brand_name),
+        }
+
+        def report(name, statements, load=lambda result: result.all()):
+            timings = []
+            for statement in statements:
+                started = time.perf_counter()
+                load(db.execute(statement))
+                timings.append((time.perf_counter() - started) * 1000)
+                # Drop the loaded cars so every query builds its objects again
+                db.expunge_all()
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f"{name}: median {statistics.median(timings):.2f} ms, p95 {p95:.2f} ms")
+
+        report("filter (join)", [joined(f) for f in filters], lambda result: result.scalars().all())
+        report("filter (car_search)", [flat(f) for f in filters], lambda result: result.mappings().all())
+        for name, statement in count_queries.items():
+            report(name, [statement] * max(1, queries // 10))
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the flat car_search table")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rebuild_parser = subparsers.add_parser("rebuild", help="Rebuild car_search from the cars, models and brands tables")
+    rebuild_parser.add_argument("--chunk-size", type=int, default=50000, help="Cars copied per statement")
+
+    benchmark_parser = subparsers.add_parser("benchmark", help="Compare joined and car_search query latency")
+    benchmark_parser.add_argument("--queries", type=int, default=200, help="Number of random filters to run")
+    benchmark_parser.add_argument("--seed", type=int, default=0, help="Seed of the random filters")
+
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        started = time.perf_counter()
+        total = rebuild_car_search(args.chunk_size)
+        print(f"Rebuilt car_search with {total} cars in {time.perf_counter() - started:.2f}s")
+    else:
+        benchmark(args.queries, args.seed)
+
+
+if __name__ == "__main__":
+    main()
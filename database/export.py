@@ -0,0 +1,238 @@
+import argparse
+import csv
+import enum
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import false, func, select
+
+from database.config import engine
+from database.models import Brand, Car, CarWithArchive, Model
+
+FORMATS = ("ndjson", "csv", "parquet")
+
+def export_columns(entity) -> List[Any]:
+    """Columns exported for the cars, or the cars with archive, with their model and brand."""
+    return [
+        entity.id,
+        entity.year,
+        entity.color,
+        entity.kilometers,
+        entity.doors,
+        entity.accents,
+        entity.price,
+        entity.description,
+        entity.version,
+        entity.created_at,
+        entity.updated_at,
+        entity.archived if entity is CarWithArchive else false().label("archived"),
+        Model.id.label("model_id"),
+        Model.name.label("model_name"),
+        Model.engine_displacement,
+        Model.fuel_type,
+        Model.consumption,
+        Model.transmission,
+        Brand.id.label("brand_id"),
+        Brand.name.label("brand_name"),
+    ]
+
+
+FIELDNAMES = [column.key for column in export_columns(Car)]
+
+
+def iter_car_chunks(start_id: Optional[int] = None, end_id: Optional[int] = None, chunk_size: int = 5000, include_archive: bool = True) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Stream the joined car/model/brand rows in chunks using a server-side cursor,
+    so only one chunk is held in memory at a time.
+
+    Args:
+        start_id (int, optional): First car id to export (inclusive)
+        end_id (int, optional): Last car id to export (inclusive)
+        chunk_size (int): Number of rows fetched per chunk
+        include_archive (bool): Also export the archived cars, flagged by the archived column
+
+    Yields:
+        list: Rows as flat dictionaries, enum values converted to strings
+    """
+    entity = CarWithArchive if include_archive else Car
+    query = select(*export_columns(entity)).join(Model, entity.model_id == Model.id).join(Brand, Model.brand_id == Brand.id)
+    if start_id is not None:
+        query = query.where(entity.id >= start_id)
+    if end_id is not None:
+        query = query.where(entity.id <= end_id)
+    query = query.order_by(entity.id)
+
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(query)
+        for partition in result.mappings().partitions():
+            yield [
+                {key: value.value if isinstance(value, enum.Enum) else value for key, value in row.items()}
+                for row in partition
+            ]
+
+
+def json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def write_ndjson(path: str, chunks: Iterator[List[Dict[str, Any]]]) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.write("".join(json.dumps(row, default=json_default, ensure_ascii=False) + "\n" for row in chunk))
+            count += len(chunk)
+    return count
+
+
+def write_csv(path: str, chunks: Iterator[List[Dict[str, Any]]]) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        for chunk in chunks:
+            writer.writerows(chunk)
+            count += len(chunk)
+    return count
+
+
+def write_parquet(path: str, chunks: Iterator[List[Dict[str, Any]]]) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires pyarrow, install it with: pip install pyarrow")
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("year", pa.int64()),
+        ("color", pa.string()),
+        ("kilometers", pa.int64()),
+        ("doors", pa.int64()),
+        ("accents", pa.int64()),
+        ("price", pa.float64()),
+        ("description", pa.string()),
+        ("version", pa.int64()),
+        ("created_at", pa.timestamp("us")),
+        ("updated_at", pa.timestamp("us")),
+        ("archived", pa.bool_()),
+        ("model_id", pa.int64()),
+        ("model_name", pa.string()),
+        ("engine_displacement", pa.float64()),
+        ("fuel_type", pa.string()),
+        ("consumption", pa.float64()),
+        ("transmission", pa.string()),
+        ("brand_id", pa.int64()),
+        ("brand_name", pa.string()),
+    ])
+
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+            count += len(chunk)
+    return count
+
+
+WRITERS = {
+    "ndjson": write_ndjson,
+    "csv": write_csv,
+    "parquet": write_parquet,
+}
+
+
+def export_range(path: str, fmt: str, start_id: Optional[int], end_id: Optional[int], chunk_size: int, include_archive: bool = True) -> int:
+    """
+    Export the cars with ids in [start_id, end_id] to a single file.
+
+    Returns:
+        int: Number of rows written
+    """
+    return WRITERS[fmt](path, iter_car_chunks(start_id, end_id, chunk_size, include_archive))
+
+
+def export_range_worker(path: str, fmt: str, start_id: Optional[int], end_id: Optional[int], chunk_size: int, include_archive: bool) -> int:
+    # Worker processes inherit the parent's pool, drop it without closing the
+    # parent's connections so each process opens its own
+    engine.dispose(close=False)
+    return export_range(path, fmt, start_id, end_id, chunk_size, include_archive)
+
+
+def split_id_ranges(workers: int, include_archive: bool = True) -> List[Tuple[int, int]]:
+    entity = CarWithArchive if include_archive else Car
+    with engine.connect() as conn:
+        min_id, max_id = conn.execute(select(func.min(entity.id), func.max(entity.id))).one()
+
+    if min_id is None:
+        return []
+
+    step = (max_id - min_id) // workers + 1
+    return [
+        (start, min(start + step - 1, max_id))
+        for start in range(min_id, max_id + 1, step)
+    ]
+
+
+def part_path(output: str, index: int) -> str:
+    base, ext = os.path.splitext(output)
+    return f"{base}-{index:04d}{ext}"
+
+
+def export_cars(output: str, fmt: str, chunk_size: int = 5000, workers: int = 1, include_archive: bool = True) -> Tuple[int, List[str]]:
+    """
+    Export the whole inventory to one file, or to one file per id range when
+    more than one worker is used. Archived cars are included unless
+    include_archive is False.
+
+    Returns:
+        tuple: Number of rows written and the list of files written
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Invalid format. Must be one of: {', '.join(FORMATS)}")
+
+    if workers <= 1:
+        return export_range(output, fmt, None, None, chunk_size, include_archive), [output]
+
+    ranges = split_id_ranges(workers, include_archive)
+    paths = [part_path(output, index) for index in range(len(ranges))]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        counts = executor.map(
+            export_range_worker,
+            paths,
+            [fmt] * len(ranges),
+            [start for start, _ in ranges],
+            [end for _, end in ranges],
+            [chunk_size] * len(ranges),
+            [include_archive] * len(ranges),
+        )
+        total = sum(counts)
+
+    return total, paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the car inventory")
+    parser.add_argument("output", help="Output file path")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson", help="Output format")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows fetched and written per chunk")
+    parser.add_argument("--workers", type=int, default=1, help="Export id ranges in parallel, one file per range")
+    parser.add_argument("--archive", action=argparse.BooleanOptionalAction, default=True, help="Include the archived cars (default: included)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    total, paths = export_cars(args.output, args.format, args.chunk_size, args.workers, args.archive)
+    elapsed = time.perf_counter() - started
+
+    for path in paths:
+        print(f"Written {path}")
+    print(f"Exported {total} cars in {elapsed:.2f}s ({total / elapsed if elapsed else 0:.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
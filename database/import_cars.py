@@ -0,0 +1,281 @@
+import argparse
+import csv
+import json
+import math
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Float, Integer, String, bindparam, func, insert, select, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session
+
+from database.archive_cars import restore_archived_cars
+from database.car_changes import record_car_changes
+from database.car_search import refresh_car_search
+from database.config import get_db
+from database.models import Brand, Car, ChangeOperation, Model, CAR_REQUIRED_FIELDS
+
+FORMATS = ("csv", "ndjson")
+
+KEY_FIELD = "external_id"
+
+FIELD_TYPES = {
+    'year': int,
+    'color': str,
+    'kilometers': int,
+    'doors': int,
+    'accents': int,
+    'price': float,
+    'description': str,
+}
+
+# Range of the INT columns, values outside it are refused by MySQL in strict mode
+INT_MIN = -2 ** 31
+INT_MAX = 2 ** 31 - 1
+
+
+def read_rows(path: str, fmt: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """
+    Stream the rows of a CSV or NDJSON file.
+
+    Yields:
+        tuple: Line number and the raw row, None when an NDJSON line is not a JSON object
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                yield line_number, row if isinstance(row, dict) else None
+
+
+def load_model_ids(db: Session) -> Dict[Tuple[str, str], int]:
+    """
+    Load every brand/model name pair at once, keyed case-insensitively like the
+    lookups done by create_car.
+    """
+    rows = db.execute(select(Brand.name, Model.name, Model.id).join(Model, Model.brand_id == Brand.id)).all()
+    return {(brand_name.lower(), model_name.lower()): model_id for brand_name, model_name, model_id in rows}
+
+
+def validate_row(row: Optional[Dict[str, Any]], model_ids: Dict[Tuple[str, str], int], brand_names: set) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Validate a raw row against the fields required by create_car and convert it
+    to the values stored in the cars table.
+
+    Returns:
+        tuple: The car values and None, or None and the reason the row was rejected
+    """
+    if row is None:
+        return None, "Invalid row, expected a JSON object"
+
+    for field in [KEY_FIELD] + CAR_REQUIRED_FIELDS:
+        if row.get(field) in (None, ""):
+            return None, f"Missing required field: {field}"
+
+    brand_name = str(row['brand_name']).lower()
+    if brand_name not in brand_names:
+        return None, f"Brand '{row['brand_name']}' not found, you can add it to the database first"
+
+    model_id = model_ids.get((brand_name, str(row['model_name']).lower()))
+    if model_id is None:
+        return None, f"Model '{row['model_name']}' not found for brand '{row['brand_name']}', you can add it to the database first"
+
+    values = {KEY_FIELD: str(row[KEY_FIELD]), 'model_id': model_id}
+    for field, field_type in FIELD_TYPES.items():
+        value = row.get(field)
+        if value in (None, ""):
+            values[field] = None
+            continue
+        # int() would turn true into 1 and truncate 2020.7, refuse such JSON values instead
+        if (field_type is not str and isinstance(value, bool)) or (field_type is int and isinstance(value, float) and not value.is_integer()):
+            return None, f"Invalid value for {field}: {value!r}"
+        try:
+            values[field] = field_type(value)
+        except (TypeError, ValueError):
+            return None, f"Invalid value for {field}: {value!r}"
+
+    for field, value in values.items():
+        error = check_column_value(field, value)
+        if error:
+            return None, error
+
+    return values, None
+
+
+def check_column_value(field: str, value: Any) -> Optional[str]:
+    """
+    Check a value against the definition of its column in the cars table.
+
+    Returns:
+        str: The reason the value would be refused by the database, None if it fits
+    """
+    column = Car.__table__.c[field]
+    if value is None:
+        return None if column.nullable else f"Missing required field: {field}"
+    if isinstance(column.type, String) and column.type.length and len(value) > column.type.length:
+        return f"Value too long for {field}, at most {column.type.length} characters"
+    if isinstance(column.type, Integer) and not INT_MIN <= value <= INT_MAX:
+        return f"Out of range value for {field}: {value}"
+    if isinstance(column.type, Float) and not math.isfinite(value):
+        return f"Invalid value for {field}: {value}"
+    return None
+
+
+def upsert_chunk(db: Session, rows: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """
+    Insert or update a chunk of cars by external id, append the matching entries
+    to the change log and refresh their car_search rows, in the caller's transaction.
+    Archived cars are moved back to the cars table and updated, so an external id
+    never exists in both tiers.
+
+    Returns:
+        tuple: Number of cars created and updated
+    """
+    # Keep the last occurrence of each external id in the chunk
+    rows = list({row[KEY_FIELD]: row for row in rows}.values())
+    keys = [row[KEY_FIELD] for row in rows]
+
+    restore_archived_cars(db, keys)
+    existing = dict(db.execute(select(Car.external_id, Car.id).where(Car.external_id.in_(keys))).all())
+    changed_fields = list(FIELD_TYPES) + ['model_id']
+
+    if db.get_bind().dialect.name in ("mysql", "mariadb"):
+        statement = mysql_insert(Car.__table__).values(rows)
+        statement = statement.on_duplicate_key_update(
+            **{field: statement.inserted[field] for field in changed_fields},
+            version=Car.__table__.c.version + 1,
+            updated_at=func.now()
+        )
+        db.execute(statement)
+    else:
+        new_rows = [row for row in rows if row[KEY_FIELD] not in existing]
+        if new_rows:
+            db.execute(insert(Car.__table__), new_rows)
+
+        updated_rows = [{'car_id': existing[row[KEY_FIELD]], **row} for row in rows if row[KEY_FIELD] in existing]
+        if updated_rows:
+            table = Car.__table__
+            db.execute(
+                update(table)
+                .where(table.c.id == bindparam('car_id'))
+                .values(
+                    **{field: bindparam(field) for field in changed_fields},
+                    version=table.c.version + 1
+                ),
+                updated_rows
+            )
+
+    car_ids = db.execute(select(Car.external_id, Car.id).where(Car.external_id.in_(keys))).all()
+    refresh_car_search(db, [car_id for _, car_id in car_ids])
+    record_car_changes(db, [
+        (car_id, ChangeOperation.UPDATE if external_id in existing else ChangeOperation.CREATE)
+        for external_id, car_id in car_ids
+    ])
+
+    updated = len(existing)
+    return len(rows) - updated, updated
+
+
+def import_cars(path: str, fmt: str, rejects_path: str, chunk_size: int = 5000) -> Dict[str, int]:
+    """
+    Import cars from a CSV or NDJSON file, committing every chunk_size valid rows.
+    Rows failing validation are written to rejects_path as NDJSON with the reason.
+    When the database refuses a chunk, its rows are retried one by one and the
+    ones refused again are rejected too.
+
+    Returns:
+        dict: Number of rows read, created, updated and rejected
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Invalid format. Must be one of: {', '.join(FORMATS)}")
+
+    stats = {"read": 0, "created": 0, "updated": 0, "rejected": 0}
+    db = get_db()
+
+    try:
+        model_ids = load_model_ids(db)
+        brand_names = {name.lower() for name in db.execute(select(Brand.name)).scalars()}
+
+        with open(rejects_path, "w", encoding="utf-8") as rejects:
+            chunk = []
+
+            def reject(line_number, row, error):
+                stats["rejected"] += 1
+                rejects.write(json.dumps({"line": line_number, "error": error, "row": row}, ensure_ascii=False) + "\n")
+
+            def upsert(rows):
+                created, updated = upsert_chunk(db, rows)
+                db.commit()
+                stats["created"] += created
+                stats["updated"] += updated
+
+            def flush_chunk():
+                try:
+                    upsert([values for _, _, values in chunk])
+                except DBAPIError:
+                    db.rollback()
+                    for line_number, row, values in chunk:
+                        try:
+                            upsert([values])
+                        except DBAPIError as e:
+                            db.rollback()
+                            reject(line_number, row, str(e.orig))
+                chunk.clear()
+
+            for line_number, row in read_rows(path, fmt):
+                stats["read"] += 1
+                values, error = validate_row(row, model_ids, brand_names)
+
+                if error:
+                    reject(line_number, row, error)
+                    continue
+
+                chunk.append((line_number, row, values))
+                if len(chunk) >= chunk_size:
+                    flush_chunk()
+
+            if chunk:
+                flush_chunk()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import cars from a CSV or NDJSON file, upserting by external_id")
+    parser.add_argument("input", help="Input file path")
+    parser.add_argument("--format", choices=FORMATS, help="Input format, guessed from the file extension by default")
+    parser.add_argument("--rejects", help="Path of the NDJSON file receiving rejected rows, <input>.rejects.ndjson by default")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows written per transaction")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if os.path.splitext(args.input)[1].lower() == ".csv" else "ndjson")
+    rejects_path = args.rejects or f"{args.input}.rejects.ndjson"
+
+    started = time.perf_counter()
+    stats = import_cars(args.input, fmt, rejects_path, args.chunk_size)
+    elapsed = time.perf_counter() - started
+
+    print(f"Read {stats['read']} rows: {stats['created']} created, {stats['updated']} updated, {stats['rejected']} rejected")
+    if stats["rejected"]:
+        print(f"Rejected rows written to {rejects_path}")
+    print(f"Imported in {elapsed:.2f}s ({stats['read'] / elapsed if elapsed else 0:.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
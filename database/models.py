@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Float, Enum, ForeignKey, DDL, event, select, union_all, true, false
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -18,6 +18,12 @@ class TransmissionType(enum.Enum):
     SEMI_AUTOMATIC = "semi_automatic"
     CVT = "cvt"
 
+class ChangeOperation(enum.Enum):
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+    ARCHIVE = "archive"
+
 class Brand(Base):
     __tablename__ = "brands"
 
@@ -44,19 +50,113 @@ class Model(Base):
     brand = relationship("Brand", back_populates="models")
     cars = relationship("Car", back_populates="model")
 
+# Fields required to create a car, brand and model are given by name
+CAR_REQUIRED_FIELDS = ['brand_name', 'model_name', 'year', 'color', 'kilometers', 'doors', 'accents', 'price']
+
 class Car(Base):
     __tablename__ = "cars"
 
     id = Column(Integer, primary_key=True, index=True)
     model_id = Column(Integer, ForeignKey("models.id"), nullable=False)
-    year = Column(Integer, nullable=False)
+    year = Column(Integer, nullable=False, index=True)
     color = Column(String(50), nullable=False)
     kilometers = Column(Integer, nullable=False)
     doors = Column(Integer, nullable=False)
     accents = Column(Integer, nullable=False)
     price = Column(Float, nullable=False)
     description = Column(String(500), nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    external_id = Column(String(100), nullable=True, unique=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    model = relationship("Model", back_populates="cars") 
+    model = relationship("Model", back_populates="cars")
+
+class ArchivedCar(Base):
+    """Cold tier of cars, moved out of the cars table by database/archive_cars.py."""
+    __tablename__ = "cars_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    model_id = Column(Integer, ForeignKey("models.id"), nullable=False)
+    year = Column(Integer, nullable=False)
+    color = Column(String(50), nullable=False)
+    kilometers = Column(Integer, nullable=False)
+    doors = Column(Integer, nullable=False)
+    accents = Column(Integer, nullable=False)
+    price = Column(Float, nullable=False)
+    description = Column(String(500), nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    external_id = Column(String(100), nullable=True, unique=True)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    model = relationship("Model")
+
+ARCHIVED_CAR_COLUMNS = [column.name for column in Car.__table__.columns]
+
+cars_with_archive = union_all(
+    select(*[Car.__table__.c[name] for name in ARCHIVED_CAR_COLUMNS], false().label("archived")),
+    select(*[ArchivedCar.__table__.c[name] for name in ARCHIVED_CAR_COLUMNS], true().label("archived"))
+).subquery("cars_with_archive")
+
+class CarWithArchive(Base):
+    """Read-only view of the hot and cold tiers of cars, used when a read tool includes the archive."""
+    __table__ = cars_with_archive
+    __mapper_args__ = {"primary_key": [cars_with_archive.c.id]}
+
+    model = relationship(
+        "Model",
+        primaryjoin="foreign(CarWithArchive.model_id) == Model.id",
+        viewonly=True
+    )
+
+class CarSearch(Base):
+    """
+    Flat copy of each current car with its model and brand attributes, so searches
+    and counts run without joins. Kept in sync by database/car_search.py.
+    """
+    __tablename__ = "car_search"
+
+    car_id = Column(Integer, primary_key=True, autoincrement=False)
+    year = Column(Integer, nullable=False, index=True)
+    color = Column(String(50), nullable=False)
+    kilometers = Column(Integer, nullable=False)
+    doors = Column(Integer, nullable=False)
+    accents = Column(Integer, nullable=False)
+    price = Column(Float, nullable=False, index=True)
+    description = Column(String(500), nullable=True)
+    version = Column(Integer, nullable=False)
+    model_id = Column(Integer, nullable=False)
+    model_name = Column(String(100), nullable=False, index=True)
+    engine_displacement = Column(Float, nullable=False)
+    fuel_type = Column(Enum(FuelType), nullable=False, index=True)
+    consumption = Column(Float, nullable=False)
+    transmission = Column(Enum(TransmissionType), nullable=False, index=True)
+    brand_id = Column(Integer, nullable=False)
+    brand_name = Column(String(100), nullable=False, index=True)
+
+class CarChange(Base):
+    __tablename__ = "car_changes"
+
+    # Assigned from car_change_sequence, so sequence numbers follow commit order
+    seq = Column(Integer, primary_key=True, autoincrement=False)
+    car_id = Column(Integer, nullable=False, index=True)
+    operation = Column(Enum(ChangeOperation), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class CarChangeSequence(Base):
+    """
+    Single row holding the last car change sequence number handed out. Writers
+    lock it until they commit, see database/car_changes.py.
+    """
+    __tablename__ = "car_change_sequence"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    last_seq = Column(Integer, nullable=False)
+
+event.listen(
+    CarChangeSequence.__table__,
+    "after_create",
+    DDL("INSERT INTO car_change_sequence (id, last_seq) VALUES (1, 0)")
+)
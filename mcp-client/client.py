@@ -1,5 +1,6 @@
 import os
 import json
+import asyncio
 import aiohttp
 from datetime import datetime
 from typing import List, Dict, Any
@@ -19,8 +20,12 @@ class MCPClient:
         self.ollama_url = os.getenv("OLLAMA_BASE_URL", "http://ollama:11434")
         print(f"Using Ollama URL: {self.ollama_url}")
         
-        self.tool_selection_prompt = """Você é um assistente especializado em ajudar a escolher a ferramenta correta para consultas sobre carros.
-        Sua tarefa é analisar a pergunta do usuário e determinar qual ferramenta do servidor deve ser usada.
+        self.tool_timeout = float(os.getenv("MCP_TOOL_TIMEOUT", "30"))
+        # Keeps read tool responses small enough for the model's context
+        self.response_max_tokens = int(os.getenv("MCP_RESPONSE_MAX_TOKENS", "2000"))
+        
+        self.tool_planning_prompt = """Você é um assistente especializado em ajudar a escolher as ferramentas corretas para consultas sobre carros.
+        Sua tarefa é analisar a pergunta do usuário e determinar quais chamadas de ferramentas do servidor são necessárias para respondê-la.
         
         Ferramentas disponíveis:
         - get_all_cars: Buscar todos os carros.
@@ -29,11 +34,16 @@ class MCPClient:
         - update_car: Atualizar dados de um carro existente.
         - delete_car: Deletar um carro.
         - count_cars_by_attribute: Contar carros agrupados por algum atributo (ex: year, color, kilometers, doors, accents, price, ame, engine_displacement, fuel_type, consumption, transmission).
+        - find_similar_cars: Buscar carros parecidos com um carro ou com características informadas (preço, quilometragem, ano, motor, consumo, combustível, câmbio).
+        
+        Argumentos de cada ferramenta:
+        {signatures}
         
         Pergunta do usuário: {query}
         
-        Qual das ferramentas disponíveis é mais adequada para responder a pergunta do usuário?
-        Responda APENAS com o nome da ferramenta mais apropriada, sem explicações adicionais!
+        Se a pergunta tiver várias partes, inclua uma chamada para cada parte. As chamadas são executadas ao mesmo tempo, então não podem depender umas das outras.
+        Responda APENAS com uma lista JSON de chamadas, sem explicações adicionais, no formato:
+        [{{"tool": "nome_da_ferramenta", "arguments": {{}}}}]
         """
     
     async def connect_to_server(self):
@@ -69,27 +79,118 @@ class MCPClient:
                 print(f"Erro ao consultar o Ollama: {str(e)}")
                 return ""
 
-    async def process_query(self, query: str) -> str:
+    def parse_tool_calls(self, response: str, available_tools: List[str]) -> List[Dict[str, Any]]:
+        """
+        Extract the planned tool calls from the LLM response. A bare tool name is
+        accepted as a single call without arguments.
+        """
+        start, end = response.find("["), response.rfind("]")
+        calls = []
+        if start != -1 and end > start:
+            try:
+                calls = json.loads(response[start:end + 1])
+            except ValueError:
+                calls = []
+        if not calls:
+            calls = [{"tool": response.strip().strip("`").lower()}]
+
+        planned = []
+        for call in calls:
+            if not isinstance(call, dict):
+                continue
+            tool_name = str(call.get("tool", "")).strip().lower()
+            arguments = call.get("arguments") or {}
+            if tool_name not in available_tools or not isinstance(arguments, dict):
+                continue
+            call = {"tool": tool_name, "arguments": arguments}
+            if call not in planned:
+                planned.append(call)
+        return planned
+
+    async def call_tool(self, call: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            result = await asyncio.wait_for(
+                self.session.call_tool(call["tool"], call["arguments"]),
+                timeout=self.tool_timeout
+            )
+            return {**call, "result": result}
+        except asyncio.TimeoutError:
+            return {**call, "error": f"Tempo limite de {self.tool_timeout:g}s excedido"}
+        except Exception as e:
+            return {**call, "error": str(e)}
+
+    @staticmethod
+    def call_key(call: Dict[str, Any], keys: Dict[str, int]) -> str:
+        """Key a call by its tool name, numbering repeated calls to the same tool."""
+        keys[call["tool"]] = keys.get(call["tool"], 0) + 1
+        return call["tool"] if keys[call["tool"]] == 1 else f"{call['tool']}#{keys[call['tool']]}"
+
+    @staticmethod
+    def result_content(result: Any) -> Any:
+        """Extract the text content of a tool result, decoded when it is JSON."""
+        texts = [item.text for item in result.content if getattr(item, "text", None) is not None]
+        contents = []
+        for text in texts:
+            try:
+                contents.append(json.loads(text))
+            except ValueError:
+                contents.append(text)
+        return contents[0] if len(contents) == 1 else contents
+
+    def merge_results(self, results: List[Dict[str, Any]]) -> str:
+        """
+        Merge the results of several calls into one JSON response keyed by tool,
+        with the arguments of each call and its content or error inline.
+        """
+        keys: Dict[str, int] = {}
+        merged = {}
+        for result in results:
+            entry = {"arguments": result["arguments"]}
+            if "error" in result:
+                entry["error"] = result["error"]
+            elif result["result"].isError:
+                entry["error"] = self.result_content(result["result"])
+            else:
+                entry["result"] = self.result_content(result["result"])
+            merged[self.call_key(result, keys)] = entry
+        return json.dumps(merged, ensure_ascii=False, indent=2, default=str)
+
+    async def process_query(self, query: str) -> Any:
         if not self.session:
             return "Erro ao se conectar ao servidor!"
 
         try:
             response = await self.session.list_tools()
             available_tools = [tool.name for tool in response.tools]
+            signatures = "\n        ".join(
+                f"- {tool.name}({', '.join((tool.inputSchema or {}).get('properties', {}).keys())})"
+                for tool in response.tools
+            )
 
-            prompt = self.tool_selection_prompt.format(query=query)
-            tool_name = await self.ask_ollama(prompt)
+            prompt = self.tool_planning_prompt.format(query=query, signatures=signatures)
+            plan = await self.ask_ollama(prompt)
 
-            if not tool_name:
+            if not plan:
                 return "Desculpe, não consegui processar sua pergunta. Tente novamente."
-                
-            tool_name = tool_name.strip().lower()
 
-            if tool_name not in available_tools:
+            calls = self.parse_tool_calls(plan, available_tools)
+            budgeted_tools = {
+                tool.name for tool in response.tools
+                if "max_tokens" in (tool.inputSchema or {}).get("properties", {})
+            }
+            for call in calls:
+                if call["tool"] in budgeted_tools and "max_bytes" not in call["arguments"]:
+                    call["arguments"].setdefault("max_tokens", self.response_max_tokens)
+
+            if not calls:
                 return f"Desculpe, não consegui encontrar uma ferramenta apropriada para sua pergunta."
 
-            result = await self.session.call_tool(tool_name, {})
-            return result
+            # Independent calls share the session and run concurrently, each with its own timeout
+            results = await asyncio.gather(*(self.call_tool(call) for call in calls))
+
+            if len(results) == 1:
+                return results[0].get("result", results[0].get("error"))
+            return self.merge_results(results)
 
         except Exception as e:
             return f"Erro ao processar a consulta: {str(e)}"
@@ -128,5 +229,4 @@ async def main():
         await client.cleanup()
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())
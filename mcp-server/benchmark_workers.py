@@ -0,0 +1,144 @@
+import argparse
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+WORKERS_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "workers.py")
+
+HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json, text/event-stream",
+}
+
+
+def tool_call_body(tool: str, arguments: Dict[str, Any]) -> bytes:
+    return json.dumps({
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "tools/call",
+        "params": {"name": tool, "arguments": arguments}
+    }).encode()
+
+
+def call(connection: http.client.HTTPConnection, body: bytes) -> bool:
+    connection.request("POST", "/mcp", body=body, headers=HEADERS)
+    response = connection.getresponse()
+    payload = response.read()
+    return response.status == 200 and b'"isError":true' not in payload
+
+
+def wait_until_serving(port: int, timeout: float = 60) -> None:
+    body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "tools/list"}).encode()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            if call(connection, body):
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not start in {timeout}s")
+
+
+def load_client(port: int, connections: int, duration: float, body: bytes) -> Tuple[int, int]:
+    """
+    Send tool calls for duration seconds from several threads. Each call opens a
+    new connection, so the kernel spreads the calls over the workers instead of
+    pinning each thread to one of them.
+
+    Returns:
+        tuple: Number of successful and failed calls
+    """
+    counts = [0, 0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def run():
+        ok = failed = 0
+        while time.monotonic() < deadline:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            try:
+                if call(connection, body):
+                    ok += 1
+                else:
+                    failed += 1
+            except OSError:
+                failed += 1
+            finally:
+                connection.close()
+        with lock:
+            counts[0] += ok
+            counts[1] += failed
+
+    threads = [threading.Thread(target=run) for _ in range(connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts[0], counts[1]
+
+
+def measure(workers: int, port: int, clients: int, connections: int, duration: float, body: bytes) -> Tuple[float, int]:
+    """
+    Start workers.py with the given number of workers, drive it with load clients
+    and stop it with SIGTERM, as a deployment would.
+
+    Returns:
+        tuple: Successful calls per second and number of failed calls
+    """
+    server = subprocess.Popen([
+        sys.executable, WORKERS_SCRIPT,
+        "--workers", str(workers), "--port", str(port), "--host", "127.0.0.1", "--log-level", "warning"
+    ])
+    try:
+        wait_until_serving(port)
+        # Warm up the per-worker caches before measuring
+        load_client(port, connections * workers, 1, body)
+
+        started = time.perf_counter()
+        with ProcessPoolExecutor(clients) as pool:
+            futures = [pool.submit(load_client, port, connections, duration, body) for _ in range(clients)]
+            results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - started
+
+        ok = sum(result[0] for result in results)
+        failed = sum(result[1] for result in results)
+        return ok / elapsed, failed
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure MCP server throughput as the number of workers grows")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1, help="Largest number of workers tried, the number of cores by default")
+    parser.add_argument("--port", type=int, default=8765, help="Port the workers listen on during the benchmark")
+    parser.add_argument("--clients", type=int, default=2, help="Load generating processes")
+    parser.add_argument("--connections", type=int, default=8, help="Concurrent connections per load process")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds measured for each number of workers")
+    parser.add_argument("--tool", default="get_all_cars", help="Tool called by the load clients")
+    parser.add_argument("--arguments", default="{}", help="JSON arguments of the tool call")
+    args = parser.parse_args()
+
+    body = tool_call_body(args.tool, json.loads(args.arguments))
+    worker_counts: List[int] = sorted({1, *[2 ** i for i in range(1, args.max_workers.bit_length())], args.max_workers})
+
+    print(f"Calling {args.tool} from {args.clients} processes x {args.connections} connections for {args.duration:.0f}s per run")
+    baseline = None
+    for workers in worker_counts:
+        throughput, failed = measure(workers, args.port, args.clients, args.connections, args.duration, body)
+        baseline = baseline or throughput
+        speedup = throughput / baseline
+        print(f"{workers:>3} workers: {throughput:8.1f} calls/s, speedup {speedup:4.2f}x, efficiency {speedup / workers:4.0%}, {failed} failed", flush=True)
+
+
+if __name__ == "__main__":
+    main()
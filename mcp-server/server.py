@@ -1,5 +1,5 @@
 from mcp.server.fastmcp import FastMCP
-from tools import get_all_cars, filter_cars, create_car, update_car, delete_car, count_cars_by_attribute
+from tools import get_all_cars, filter_cars, get_filter_cache_stats, create_car, update_car, delete_car, count_cars_by_attribute, get_car_changes, find_similar_cars, get_coalescing_stats
 
 server = FastMCP(
     "ServerCarroQuery",
@@ -10,10 +10,14 @@ server = FastMCP(
 # Register tools
 server.tool()(get_all_cars)
 server.tool()(filter_cars)
+server.tool()(get_filter_cache_stats)
 server.tool()(create_car)
 server.tool()(update_car)
 server.tool()(delete_car)
 server.tool()(count_cars_by_attribute)
+server.tool()(get_car_changes)
+server.tool()(find_similar_cars)
+server.tool()(get_coalescing_stats)
 
 if __name__ == "__main__":
     server.run(transport="sse")
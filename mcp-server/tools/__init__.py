@@ -1,6 +1,9 @@
 from .get_all_cars import get_all_cars
-from .filter_cars import filter_cars
+from .filter_cars import filter_cars, get_filter_cache_stats
 from .crud_cars import create_car, update_car, delete_car
 from .count_cars import count_cars_by_attribute
+from .car_changes import get_car_changes
+from .similar_cars import find_similar_cars
+from .coalescing import get_coalescing_stats
 
-__all__ = ['get_all_cars', 'filter_cars', 'create_car', 'update_car', 'delete_car', 'count_cars_by_attribute'] 
\ No newline at end of file
+__all__ = ['get_all_cars', 'filter_cars', 'get_filter_cache_stats', 'create_car', 'update_car', 'delete_car', 'count_cars_by_attribute', 'get_car_changes', 'find_similar_cars', 'get_coalescing_stats'] 
\ No newline at end of file
@@ -0,0 +1,96 @@
+from database.config import get_db
+from database.models import Car, Model, Brand, CarChange
+from utils.sqlalchemy_utils import clean_sqlalchemy_object
+from typing import Dict, Any, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import contains_eager
+from .coalescing import read_coalescer
+
+db = get_db()
+
+MAX_CHANGES_LIMIT = 1000
+
+@read_coalescer.coalesce
+async def get_car_changes(since_seq: int = 0, limit: int = 100) -> Tuple[Dict[str, Any], int]:
+    """
+    Retrieve the changes made to cars after a given sequence number, so clients
+    can sync incrementally instead of re-fetching all cars.
+    
+    Sequence numbers are assigned in commit order: once a change is returned, no
+    change with a lower sequence number can appear later, so passing last_seq as
+    since_seq never skips a change.
+    
+    Args:
+        since_seq (int): Last sequence number already seen by the client (0 to start from the beginning)
+        limit (int): Maximum number of changes to return (1 to 1000)
+    
+    Returns:
+        tuple: A tuple containing:
+            - dict: Response with changes or error message
+                - changes (list): Changes ordered by sequence number, each containing:
+                    - seq (int): Sequence number of the change
+                    - car_id (int): ID of the changed car
+                    - operation (str): create, update, delete or archive
+                    - created_at (datetime): When the change was made
+                    - car (dict or None): Current state of the car, None if it no longer exists
+                - last_seq (int): Sequence number to pass as since_seq on the next call
+                - has_more (bool): Whether more changes are available after last_seq
+            - int: HTTP status code (200 for success, 400 for bad request, 500 for server error)
+    """
+    try:
+        if since_seq < 0:
+            return {"error": "since_seq must be greater than or equal to 0"}, 400
+        if limit < 1 or limit > MAX_CHANGES_LIMIT:
+            return {"error": f"limit must be between 1 and {MAX_CHANGES_LIMIT}"}, 400
+
+        changes = db.execute(
+            select(CarChange)
+            .where(CarChange.seq > since_seq)
+            .order_by(CarChange.seq)
+            .limit(limit + 1)
+        ).scalars().all()
+
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        car_ids = {change.car_id for change in changes}
+        cars = {}
+        if car_ids:
+            cars = {
+                car.id: {
+                    **clean_sqlalchemy_object(car),
+                    "model": {
+                        **clean_sqlalchemy_object(car.model),
+                        "brand": clean_sqlalchemy_object(car.model.brand)
+                    }
+                }
+                for car in db.execute(
+                    select(Car)
+                    .join(Model)
+                    .join(Brand)
+                    .options(contains_eager(Car.model).contains_eager(Model.brand))
+                    .where(Car.id.in_(car_ids))
+                    .execution_options(populate_existing=True)
+                ).scalars()
+            }
+
+        results = [{
+            "seq": change.seq,
+            "car_id": change.car_id,
+            "operation": change.operation.value,
+            "created_at": change.created_at,
+            "car": cars.get(change.car_id)
+        } for change in changes]
+
+        # End the read transaction so the next call sees changes committed since
+        db.rollback()
+
+        return {
+            "changes": results,
+            "last_seq": changes[-1].seq if changes else since_seq,
+            "has_more": has_more
+        }, 200
+
+    except Exception as e:
+        db.rollback()
+        return {"error": str(e)}, 500
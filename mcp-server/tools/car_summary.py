@@ -0,0 +1,254 @@
+import enum
+import json
+import random
+from database.models import Car, CarSearch, Model, Brand
+from utils.sqlalchemy_utils import clean_sqlalchemy_object
+from typing import Dict, Any, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, contains_eager
+
+BYTES_PER_TOKEN = 4
+ESTIMATED_CAR_BYTES = 700
+TOP_CATEGORIES = 5
+MAX_SAMPLE_SIZE = 5
+
+NUMERIC_SUMMARY_FIELDS = ['price', 'kilometers', 'year', 'engine_displacement', 'consumption']
+CATEGORY_SUMMARY_FIELDS = ['brand_name', 'model_name', 'fuel_type', 'transmission', 'color']
+
+class BudgetTooSmallError(ValueError):
+    """Raised when a budget is below the size of the smallest possible summary."""
+
+def summary_columns(entity) -> Dict[str, Any]:
+    """
+    Columns the summaries are computed on, read from the flat car_search table or
+    from the cars (or cars with archive) joined with their model and brand.
+    """
+    if entity is CarSearch:
+        return {
+            'id': CarSearch.car_id,
+            **{name: getattr(CarSearch, name) for name in NUMERIC_SUMMARY_FIELDS + CATEGORY_SUMMARY_FIELDS}
+        }
+
+    return {
+        'id': entity.id,
+        'price': entity.price,
+        'kilometers': entity.kilometers,
+        'year': entity.year,
+        'engine_displacement': Model.engine_displacement,
+        'consumption': Model.consumption,
+        'brand_name': Brand.name,
+        'model_name': Model.name,
+        'fuel_type': Model.fuel_type,
+        'transmission': Model.transmission,
+        'color': entity.color,
+    }
+
+def summary_query(entity, *columns, where=None):
+    query = select(*columns).select_from(entity)
+    if entity is not CarSearch:
+        query = query.join(entity.model).join(Brand)
+    return query.where(where) if where is not None else query
+
+def cars_query(entity):
+    """Select cars, or cars with archive, with their model and brand loaded."""
+    return (
+        select(entity)
+        .join(entity.model)
+        .join(Brand)
+        .options(contains_eager(entity.model).contains_eager(Model.brand))
+    )
+
+def car_search_query():
+    """Select whole car_search rows, to be serialized with serialize_car_search."""
+    return select(*CarSearch.__table__.columns)
+
+def response_budget(max_bytes: Optional[int], max_tokens: Optional[int]) -> Optional[int]:
+    """
+    Convert the byte and token budgets of a read tool into a single byte budget,
+    using the smallest one when both are given. Tokens are estimated at 4 bytes each.
+    """
+    budgets = [budget for budget in (max_bytes, max_tokens * BYTES_PER_TOKEN if max_tokens is not None else None) if budget is not None]
+    return min(budgets) if budgets else None
+
+def response_size(response: Dict[str, Any]) -> int:
+    return len(json.dumps(response, default=str))
+
+def serialize_car(car: Car) -> Dict[str, Any]:
+    return {
+        **clean_sqlalchemy_object(car),
+        "model": {
+            **clean_sqlalchemy_object(car.model),
+            "brand": clean_sqlalchemy_object(car.model.brand)
+        }
+    }
+
+def serialize_car_search(row) -> Dict[str, Any]:
+    """
+    Serialize a car_search row in the shape of serialize_car, nesting the model and
+    brand from the flat columns. Timestamps are not kept in car_search.
+    """
+    return {
+        "id": row["car_id"],
+        "model_id": row["model_id"],
+        "year": row["year"],
+        "color": row["color"],
+        "kilometers": row["kilometers"],
+        "doors": row["doors"],
+        "accents": row["accents"],
+        "price": row["price"],
+        "description": row["description"],
+        "version": row["version"],
+        "model": {
+            "id": row["model_id"],
+            "brand_id": row["brand_id"],
+            "name": row["model_name"],
+            "engine_displacement": row["engine_displacement"],
+            "fuel_type": row["fuel_type"],
+            "consumption": row["consumption"],
+            "transmission": row["transmission"],
+            "brand": {
+                "id": row["brand_id"],
+                "name": row["brand_name"]
+            }
+        }
+    }
+
+def exceeds_budget(db: Session, budget: Optional[int], where=None, params: Optional[Dict[str, Any]] = None, entity=Car) -> bool:
+    """
+    Tell from a count query, before loading any car, whether the cars matching a
+    condition are expected not to fit the budget.
+    """
+    if budget is None:
+        return False
+
+    query = summary_query(entity, func.count(summary_columns(entity)['id']), where=where)
+    return db.execute(query, params or {}).scalar() * ESTIMATED_CAR_BYTES > budget
+
+def summarize_cars(db: Session, budget: int, where=None, params: Optional[Dict[str, Any]] = None, entity=Car) -> Dict[str, Any]:
+    """
+    Summarize the cars matching a condition in SQL instead of returning them, so
+    the response size does not grow with the number of cars.
+
+    Args:
+        db (Session): Session to run the queries with
+        budget (int): Maximum response size in bytes, bounds the size of the sample
+        where: Optional condition selecting the cars, as used by the read tools
+        params (dict, optional): Bind parameter values used by the condition
+        entity: Car, CarSearch to summarize without joins, or CarWithArchive to include archived cars
+
+    Returns:
+        dict: Summary containing:
+            - total (int): Number of matching cars
+            - ranges (dict): min, max and avg of price, kilometers, year, engine_displacement and consumption
+            - top_categories (dict): Most common brand_name, model_name, fuel_type, transmission and color with their counts
+            - sample (list): A few random matching cars, as many as fit the budget
+
+        The least common categories, then the ranges, are dropped when the summary
+        does not fit the budget.
+
+    Raises:
+        BudgetTooSmallError: When the budget cannot hold even the total count
+    """
+    params = params or {}
+    columns = summary_columns(entity)
+
+    aggregates = [
+        aggregate(columns[name])
+        for name in NUMERIC_SUMMARY_FIELDS
+        for aggregate in (func.min, func.max, func.avg)
+    ]
+    row = db.execute(
+        summary_query(entity, func.count(columns['id']), func.min(columns['id']), func.max(columns['id']), *aggregates, where=where),
+        params
+    ).one()
+    total, min_id, max_id, *values = row
+    ranges = {
+        name: {
+            "min": values[index * 3],
+            "max": values[index * 3 + 1],
+            "avg": round(float(values[index * 3 + 2]), 2) if values[index * 3 + 2] is not None else None
+        }
+        for index, name in enumerate(NUMERIC_SUMMARY_FIELDS)
+    }
+
+    top_categories = {}
+    for name in CATEGORY_SUMMARY_FIELDS:
+        column = columns[name]
+        count = func.count(columns['id']).label("count")
+        results = db.execute(
+            summary_query(entity, column, count, where=where).group_by(column).order_by(count.desc()).limit(TOP_CATEGORIES),
+            params
+        ).all()
+        top_categories[name] = [
+            {"value": value.value if isinstance(value, enum.Enum) else value, "count": value_count}
+            for value, value_count in results
+        ]
+
+    summary = {
+        "total": total,
+        "ranges": ranges,
+        "top_categories": top_categories,
+        "sample": []
+    }
+
+    fit_summary(summary, budget)
+
+    # Probe random ids instead of sorting every matching car in random order. A
+    # probe is an index seek when every car matches, but with a selective condition
+    # it scans forward in id order up to the next matching car, and on
+    # CarWithArchive the union is read in full. In the worst case each of the
+    # MAX_SAMPLE_SIZE probes reads every car. Cars following a gap in the matching
+    # ids are drawn more often, so the sample is random but not uniform.
+    sample_ids = set()
+    if total:
+        for _ in range(MAX_SAMPLE_SIZE):
+            probe = summary_query(entity, columns['id'], where=where).where(columns['id'] >= random.randint(min_id, max_id))
+            car_id = db.execute(probe.order_by(columns['id']).limit(1), params).scalar()
+            if car_id is not None:
+                sample_ids.add(car_id)
+    cars = []
+    if sample_ids and entity is CarSearch:
+        rows = db.execute(car_search_query().where(CarSearch.car_id.in_(sample_ids))).mappings()
+        cars = [serialize_car_search(row) for row in rows]
+    elif sample_ids:
+        cars = [serialize_car(car) for car in db.execute(cars_query(entity).where(entity.id.in_(sample_ids))).scalars()]
+
+    size = response_size({"summary": summary})
+    for car in cars:
+        car_size = response_size(car) + 2
+        if size + car_size > budget:
+            break
+        summary["sample"].append(car)
+        size += car_size
+
+    return summary
+
+def fit_summary(summary: Dict[str, Any], budget: int) -> None:
+    """
+    Drop the least common categories, then the ranges, until the summary fits the
+    budget.
+
+    Raises:
+        BudgetTooSmallError: When the summary does not fit even without them
+    """
+    ranges, top_categories = summary["ranges"], summary["top_categories"]
+    while response_size({"summary": summary}) > budget:
+        longest = max(top_categories.values(), key=len, default=None)
+        if longest:
+            longest.pop()
+        elif top_categories:
+            top_categories.clear()
+        elif ranges:
+            ranges.popitem()
+        else:
+            raise BudgetTooSmallError(f"Budget of {budget} bytes is below the smallest summary of {response_size({'summary': summary})} bytes")
+
+def budgeted_cars_response(db: Session, cars: List[Dict[str, Any]], budget: Optional[int], where=None, params: Optional[Dict[str, Any]] = None, entity=Car) -> Dict[str, Any]:
+    """
+    Build a read tool response from serialized cars, replacing them with a summary
+    when the response would exceed the budget.
+    """
+    response = {"cars": cars}
+    if budget is not None and response_size(response) > budget:
+        return {"summary": summarize_cars(db, budget, where, params, entity)}
+    return response
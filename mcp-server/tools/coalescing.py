@@ -0,0 +1,16 @@
+from utils.single_flight import SingleFlight
+from typing import Dict, Any, Tuple
+
+read_coalescer = SingleFlight()
+
+async def get_coalescing_stats() -> Tuple[Dict[str, Any], int]:
+    """
+    Report how many read tool calls were coalesced with an identical call already in flight.
+    
+    Returns:
+        tuple: A tuple containing:
+            - dict: Response with, for each read tool, the number of calls, of database
+              executions, of calls coalesced and of executions currently in flight
+            - int: HTTP status code (200 for success)
+    """
+    return {"coalescing": read_coalescer.stats()}, 200
@@ -1,11 +1,13 @@
 from database.config import get_db
-from database.models import Car, Model, Brand
+from database.models import Car, CarSearch, CarWithArchive, Model, Brand
 from sqlalchemy import func
 from typing import Dict, Any, Tuple
+from .coalescing import read_coalescer
 
 db = get_db()
 
-async def count_cars_by_attribute(attribute: str) -> Tuple[Dict[str, Any], int]:
+@read_coalescer.coalesce
+async def count_cars_by_attribute(attribute: str, include_archive: bool = False) -> Tuple[Dict[str, Any], int]:
     """
     Count cars grouped by a specific attribute.
     
@@ -15,6 +17,7 @@ async def count_cars_by_attribute(attribute: str) -> Tuple[Dict[str, Any], int]:
             - Car attributes: year, color, kilometers, doors, accents, price
             - Model attributes: name, engine_displacement, fuel_type, consumption, transmission
             - Brand attributes: name
+        include_archive (bool): Also count archived cars, only current cars are counted by default
     
     Returns:
         tuple: A tuple containing:
@@ -22,13 +25,14 @@ async def count_cars_by_attribute(attribute: str) -> Tuple[Dict[str, Any], int]:
             - int: HTTP status code (200 for success, 400 for bad request, 500 for server error)
     """
     try:
+        entity = CarWithArchive if include_archive else Car
         attribute_map = {
-            'year': (Car, Car.year),
-            'color': (Car, Car.color),
-            'kilometers': (Car, Car.kilometers),
-            'doors': (Car, Car.doors),
-            'accents': (Car, Car.accents),
-            'price': (Car, Car.price),
+            'year': (Car, entity.year),
+            'color': (Car, entity.color),
+            'kilometers': (Car, entity.kilometers),
+            'doors': (Car, entity.doors),
+            'accents': (Car, entity.accents),
+            'price': (Car, entity.price),
             'model_name': (Model, Model.name),
             'engine_displacement': (Model, Model.engine_displacement),
             'fuel_type': (Model, Model.fuel_type),
@@ -44,12 +48,16 @@ async def count_cars_by_attribute(attribute: str) -> Tuple[Dict[str, Any], int]:
 
         model, column = attribute_map[attribute]
         
-        if model == Car:
-            query = db.query(column, func.count(Car.id)).group_by(column)
+        if not include_archive:
+            # Current cars are counted from car_search, which has every attribute without joins
+            column = getattr(CarSearch, attribute)
+            query = db.query(column, func.count(CarSearch.car_id)).group_by(column)
+        elif model == Car:
+            query = db.query(column, func.count(entity.id)).select_from(entity).group_by(column)
         elif model == Model:
-            query = db.query(column, func.count(Car.id)).join(Car).group_by(column)
+            query = db.query(column, func.count(entity.id)).select_from(entity).join(entity.model).group_by(column)
         elif model == Brand:
-            query = db.query(column, func.count(Car.id)).select_from(Brand).join(Model).join(Car).group_by(column)
+            query = db.query(column, func.count(entity.id)).select_from(entity).join(entity.model).join(Brand).group_by(column)
         else:
             return {"error": "Invalid model. Must be one of: Car, Model, Brand"}, 400
 
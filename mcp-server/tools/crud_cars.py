@@ -1,8 +1,11 @@
 from database.config import get_db
-from database.models import Car, Model, Brand, FuelType, TransmissionType
+from database.models import Car, Model, Brand, FuelType, TransmissionType, ChangeOperation, CAR_REQUIRED_FIELDS
 from utils.sqlalchemy_utils import clean_sqlalchemy_object
-from typing import Dict, Any, Tuple
-from sqlalchemy import or_
+from database.car_changes import record_car_changes
+from database.car_search import refresh_car_search
+from typing import Dict, Any, Optional, Tuple
+from sqlalchemy import or_, select, update, delete
+from sqlalchemy.orm import contains_eager
 
 db = get_db()
 
@@ -28,8 +31,7 @@ async def create_car(car_data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
             - int: HTTP status code (201 for success, 400 for bad request, 500 for server error)
     """
     try:
-        required_fields = ['brand_name', 'model_name', 'year', 'color', 'kilometers', 'doors', 'accents', 'price']
-        for field in required_fields:
+        for field in CAR_REQUIRED_FIELDS:
             if field not in car_data:
                 return {"error": f"Missing required field: {field}"}, 400
 
@@ -57,6 +59,9 @@ async def create_car(car_data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
 
         new_car = Car(**car_create_data)
         db.add(new_car)
+        db.flush()
+        refresh_car_search(db, [new_car.id])
+        record_car_changes(db, [(new_car.id, ChangeOperation.CREATE)])
         db.commit()
         db.refresh(new_car)
 
@@ -109,6 +114,10 @@ async def update_car(car_id: int, car_data: Dict[str, Any]) -> Tuple[Dict[str, A
     """
     Update an existing car in the database.
     
+    The update is issued directly by id as a single statement. When a version is
+    given it is applied as a compare-and-swap, so the update only succeeds if the
+    car has not been modified since that version was read.
+    
     Args:
         car_id (int): ID of the car to update
         car_data (dict): Dictionary containing car information to update including:
@@ -119,25 +128,53 @@ async def update_car(car_id: int, car_data: Dict[str, Any]) -> Tuple[Dict[str, A
             - accents (int, optional): Number of accents
             - price (float, optional): Price of the car
             - description (str, optional): Description of the car
+            - version (int, optional): Version of the car the changes are based on
     
     Returns:
         tuple: A tuple containing:
             - dict: Response with updated car or error message
-            - int: HTTP status code (200 for success, 404 for not found, 500 for server error)
+            - int: HTTP status code (200 for success, 404 for not found, 409 for version conflict, 500 for server error)
     """
     try:
-        car = db.query(Car).filter(Car.id == car_id).first()
-        
-        if not car:
-            return {"error": "Car not found, you can add it to the database first"}, 404
-
         updateable_fields = ['year', 'color', 'kilometers', 'doors', 'accents', 'price', 'description']
-        for field in updateable_fields:
-            if field in car_data:
-                setattr(car, field, car_data[field])
-
-        db.commit()
-        db.refresh(car)
+        values = {field: car_data[field] for field in updateable_fields if field in car_data}
+        values['version'] = Car.version + 1
+
+        statement = update(Car).where(Car.id == car_id).values(**values)
+        if car_data.get('version') is not None:
+            statement = statement.where(Car.version == car_data['version'])
+        statement = statement.execution_options(synchronize_session=False)
+
+        if db.get_bind().dialect.update_returning:
+            car = db.execute(
+                statement.returning(Car).execution_options(populate_existing=True)
+            ).scalars().first()
+            updated = car is not None
+            if updated:
+                # Keep a reference so the loaded model stays in the identity map for car.model
+                model = db.execute(
+                    select(Model)
+                    .join(Brand)
+                    .options(contains_eager(Model.brand))
+                    .where(Model.id == car.model_id)
+                ).scalars().first()
+        else:
+            car = None
+            updated = db.execute(statement).rowcount > 0
+
+        if not updated:
+            db.rollback()
+            return write_conflict_response(car_id, car_data.get('version'), "Car not found, you can add it to the database first")
+
+        if car is None:
+            car = db.execute(
+                select(Car)
+                .join(Model)
+                .join(Brand)
+                .options(contains_eager(Car.model).contains_eager(Model.brand))
+                .where(Car.id == car_id)
+                .execution_options(populate_existing=True)
+            ).scalars().first()
 
         result = {
             **clean_sqlalchemy_object(car),
@@ -147,31 +184,43 @@ async def update_car(car_id: int, car_data: Dict[str, Any]) -> Tuple[Dict[str, A
             }
         }
 
+        refresh_car_search(db, [car_id])
+        record_car_changes(db, [(car_id, ChangeOperation.UPDATE)])
+        db.commit()
+
         return {"car": result}, 200
 
     except Exception as e:
         db.rollback()
         return {"error": str(e)}, 500
 
-async def delete_car(car_id: int) -> Tuple[Dict[str, Any], int]:
+async def delete_car(car_id: int, version: Optional[int] = None) -> Tuple[Dict[str, Any], int]:
     """
     Delete a car from the database.
     
     Args:
         car_id (int): ID of the car to delete
+        version (int, optional): Version of the car the deletion is based on, the
+            car is only deleted if it has not been modified since
     
     Returns:
         tuple: A tuple containing:
             - dict: Response with success message or error
-            - int: HTTP status code (200 for success, 404 for not found, 500 for server error)
+            - int: HTTP status code (200 for success, 404 for not found, 409 for version conflict, 500 for server error)
     """
     try:
-        car = db.query(Car).filter(Car.id == car_id).first()
-        
-        if not car:
-            return {"error": "Car not found"}, 404
+        statement = delete(Car).where(Car.id == car_id)
+        if version is not None:
+            statement = statement.where(Car.version == version)
+
+        result = db.execute(statement.execution_options(synchronize_session=False))
 
-        db.delete(car)
+        if result.rowcount == 0:
+            db.rollback()
+            return write_conflict_response(car_id, version, "Car not found")
+
+        refresh_car_search(db, [car_id])
+        record_car_changes(db, [(car_id, ChangeOperation.DELETE)])
         db.commit()
 
         return {"message": "Car successfully deleted"}, 200
@@ -179,3 +228,21 @@ async def delete_car(car_id: int) -> Tuple[Dict[str, Any], int]:
     except Exception as e:
         db.rollback()
         return {"error": str(e)}, 500
+
+def write_conflict_response(car_id: int, version: Optional[int], not_found_message: str) -> Tuple[Dict[str, Any], int]:
+    """
+    Build the response for a write by id that matched no rows, telling apart a
+    missing car from a version conflict. Only runs on the failure path.
+    """
+    current_version = None
+    if version is not None:
+        current_version = db.execute(select(Car.version).where(Car.id == car_id)).scalar()
+        db.rollback()
+
+    if current_version is None:
+        return {"error": not_found_message}, 404
+
+    return {
+        "error": f"Car was modified by another request (expected version {version}, current version {current_version}), reload it and try again",
+        "current_version": current_version
+    }, 409
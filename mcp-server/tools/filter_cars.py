@@ -1,15 +1,79 @@
-from sqlalchemy import and_
-from utils.sqlalchemy_utils import clean_sqlalchemy_object, add_exact_match_condition, add_range_condition, add_text_search_condition
-from database.config import get_db
-from database.models import Car, Model, Brand
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+from sqlalchemy import and_, bindparam, select
+from utils.sqlalchemy_utils import add_exact_match_condition, add_range_condition, add_text_search_condition, text_search_pattern
+from utils.statement_cache import StatementCache
+from database.config import get_db, engine
+from database.models import CarSearch, CarWithArchive, Model, Brand
 from .models import CarFilter
+from .car_summary import BudgetTooSmallError, response_budget, exceeds_budget, summarize_cars, budgeted_cars_response, cars_query, car_search_query, serialize_car, serialize_car_search
+from .coalescing import read_coalescer
 
 db = get_db()
 
-async def filter_cars(filters: CarFilter):
+TEXT_SEARCH_FIELDS = {'color', 'description', 'model_name', 'brand_name'}
+
+def build_filter_statement(shape: Tuple[bool, FrozenSet[str]]):
+    """
+    Build the filter query for a filter shape, i.e. whether the archive is included
+    and the set of filter fields provided, leaving every value as a bind parameter.
+
+    Current cars are searched and read from the flat car_search table alone; with
+    the archive, the cars are selected through the joins.
+    """
+    include_archive, fields = shape
+    params = {name: bindparam(name) for name in fields}
+    conditions = []
+
+    if include_archive:
+        columns = {
+            'year': CarWithArchive.year,
+            'color': CarWithArchive.color,
+            'kilometers': CarWithArchive.kilometers,
+            'doors': CarWithArchive.doors,
+            'accents': CarWithArchive.accents,
+            'price': CarWithArchive.price,
+            'description': CarWithArchive.description,
+            'model_name': Model.name,
+            'brand_name': Brand.name,
+            'engine_displacement': Model.engine_displacement,
+            'fuel_type': Model.fuel_type,
+            'consumption': Model.consumption,
+            'transmission': Model.transmission,
+        }
+    else:
+        columns = {name: getattr(CarSearch, name) for name in (
+            'year', 'color', 'kilometers', 'doors', 'accents', 'price', 'description', 'model_name',
+            'brand_name', 'engine_displacement', 'fuel_type', 'consumption', 'transmission'
+        )}
+
+    add_exact_match_condition(conditions, params.get('year'), columns['year'])
+    add_text_search_condition(conditions, params.get('color'), columns['color'])
+    add_range_condition(conditions, params.get('min_kilometers'), params.get('max_kilometers'), columns['kilometers'])
+    add_exact_match_condition(conditions, params.get('doors'), columns['doors'])
+    add_exact_match_condition(conditions, params.get('accents'), columns['accents'])
+    add_range_condition(conditions, params.get('min_price'), params.get('max_price'), columns['price'])
+    add_text_search_condition(conditions, params.get('description'), columns['description'])
+    add_text_search_condition(conditions, params.get('model_name'), columns['model_name'])
+    add_text_search_condition(conditions, params.get('brand_name'), columns['brand_name'])
+    add_range_condition(conditions, params.get('min_engine_displacement'), params.get('max_engine_displacement'), columns['engine_displacement'])
+    add_exact_match_condition(conditions, params.get('fuel_type'), columns['fuel_type'])
+    add_range_condition(conditions, params.get('min_consumption'), params.get('max_consumption'), columns['consumption'])
+    add_exact_match_condition(conditions, params.get('transmission'), columns['transmission'])
+
+    if include_archive:
+        return cars_query(CarWithArchive).where(and_(*conditions))
+    return car_search_query().where(and_(*conditions))
+
+statement_cache = StatementCache("filter_cars", build_filter_statement, engine)
+
+@read_coalescer.coalesce
+async def filter_cars(filters: CarFilter, include_archive: bool = False, max_bytes: Optional[int] = None, max_tokens: Optional[int] = None):
     """
     Filter cars based on various criteria.
     
+    When a byte or token budget is given and the matching cars would not fit in it,
+    a summary computed in the database is returned instead of the cars.
+    
     Args:
         filters (CarFilter): Filter criteria with the following attributes:
             - year (Optional[int]): Year of the car
@@ -29,54 +93,55 @@ async def filter_cars(filters: CarFilter):
             - min_consumption (Optional[float]): Minimum fuel consumption
             - max_consumption (Optional[float]): Maximum fuel consumption
             - transmission (Optional[manual, automatic, semi_automatic, cvt]): Type of transmission
+        include_archive (bool): Also search archived cars, only current cars are searched by default
+        max_bytes (int, optional): Maximum size of the response in bytes
+        max_tokens (int, optional): Maximum size of the response in tokens
     
     Returns:
         tuple: A tuple containing:
-            - dict: Response with filtered cars or error message
+            - dict: Response with filtered cars, a summary of them when over budget (total count,
+              value ranges, top categories and a small sample of cars) or error message.
+              Current cars are read from car_search and carry no timestamps
             - int: HTTP status code (200 for success, 400 for bad request, 500 for server error)
     """
     try:
-        if all(param is None for param in [
-            filters.year, filters.color, filters.min_kilometers, 
-            filters.max_kilometers, filters.doors, filters.accents, 
-            filters.min_price, filters.max_price, filters.description,
-            filters.model_name, filters.brand_name, filters.min_engine_displacement, 
-            filters.max_engine_displacement, filters.fuel_type, filters.min_consumption, 
-            filters.max_consumption, filters.transmission
-        ]):
+        values = filters.model_dump(exclude_none=True)
+        if not values:
             return {"error": "At least one filter parameter must be provided"}, 400
 
-        query = db.query(Car).join(Model).join(Brand)
-        conditions = []
-        
-        add_exact_match_condition(conditions, filters.year, Car.year)
-        add_text_search_condition(conditions, filters.color, Car.color)
-        add_range_condition(conditions, filters.min_kilometers, filters.max_kilometers, Car.kilometers)
-        add_exact_match_condition(conditions, filters.doors, Car.doors)
-        add_exact_match_condition(conditions, filters.accents, Car.accents)
-        add_range_condition(conditions, filters.min_price, filters.max_price, Car.price)
-        add_text_search_condition(conditions, filters.description, Car.description)
-        add_text_search_condition(conditions, filters.model_name, Model.name)
-        add_text_search_condition(conditions, filters.brand_name, Brand.name)
-        add_range_condition(conditions, filters.min_engine_displacement, filters.max_engine_displacement, Model.engine_displacement)
-        add_exact_match_condition(conditions, filters.fuel_type, Model.fuel_type)
-        add_range_condition(conditions, filters.min_consumption, filters.max_consumption, Model.consumption)
-        add_exact_match_condition(conditions, filters.transmission, Model.transmission)
-        
-        if conditions:
-            query = query.filter(and_(*conditions))
-        
-        cars = query.all()
-        
-        results = [{
-            **clean_sqlalchemy_object(car),
-            "model": {
-                **clean_sqlalchemy_object(car.model),
-                "brand": clean_sqlalchemy_object(car.model.brand)
-            }
-        } for car in cars]
+        statement = statement_cache.get((include_archive, frozenset(values)))
+        entity = CarWithArchive if include_archive else CarSearch
+        params = {
+            name: text_search_pattern(value) if name in TEXT_SEARCH_FIELDS else value
+            for name, value in values.items()
+        }
+
+        budget = response_budget(max_bytes, max_tokens)
+        where = statement.whereclause
+        if exceeds_budget(db, budget, where, params, entity):
+            return {"summary": summarize_cars(db, budget, where, params, entity)}, 200
+
+        if include_archive:
+            cars = [serialize_car(car) for car in db.execute(statement, params).scalars()]
+        else:
+            cars = [serialize_car_search(row) for row in db.execute(statement, params).mappings()]
         
-        return {"cars": results}, 200
+        return budgeted_cars_response(db, cars, budget, where, params, entity), 200
     
+    except BudgetTooSmallError as e:
+        return {"error": str(e)}, 400
+
     except Exception as e:
         return {"error": str(e)}, 500
+
+async def get_filter_cache_stats() -> Tuple[Dict[str, Any], int]:
+    """
+    Report how well filter_cars reuses its prebuilt statements.
+    
+    Returns:
+        tuple: A tuple containing:
+            - dict: Response with the number of cached filter shapes and the hit rates
+              of the statement cache and of SQLAlchemy's compiled cache
+            - int: HTTP status code (200 for success)
+    """
+    return {"cache": statement_cache.stats()}, 200
@@ -1,13 +1,24 @@
 from database.config import get_db
-from database.models import Car, Model, Brand
-from utils.sqlalchemy_utils import clean_sqlalchemy_object
+from database.models import Car, CarSearch, CarWithArchive, Brand
+from typing import Optional
+from .car_summary import BudgetTooSmallError, response_budget, exceeds_budget, summarize_cars, budgeted_cars_response, serialize_car
+from .coalescing import read_coalescer
 
 db = get_db()
 
-async def get_all_cars():
+@read_coalescer.coalesce
+async def get_all_cars(include_archive: bool = False, max_bytes: Optional[int] = None, max_tokens: Optional[int] = None):
     """
     Retrieve all cars from the database with their associated model and brand information.
     
+    When a byte or token budget is given and the cars would not fit in it, a summary
+    computed in the database is returned instead of the cars.
+    
+    Args:
+        include_archive (bool): Also return archived cars, only current cars are returned by default
+        max_bytes (int, optional): Maximum size of the response in bytes
+        max_tokens (int, optional): Maximum size of the response in tokens
+    
     Returns:
         tuple: A tuple containing:
             - dict: Response with all cars or error message
@@ -16,20 +27,24 @@ async def get_all_cars():
                     - model (dict): Model information including:
                         - model details (from clean_sqlalchemy_object)
                         - brand (dict): Brand information (from clean_sqlalchemy_object)
-            - int: HTTP status code (200 for success, 500 for server error)
+                - summary (dict): Returned instead of cars when over budget, with the total
+                  count, value ranges, top categories and a small sample of cars
+            - int: HTTP status code (200 for success, 400 for a budget below the smallest summary, 500 for server error)
     """
     try:
-        cars = db.query(Car).join(Model).join(Brand).all()
-        
-        results = [{
-            **clean_sqlalchemy_object(car),
-            "model": {
-                **clean_sqlalchemy_object(car.model),
-                "brand": clean_sqlalchemy_object(car.model.brand)
-            }
-        } for car in cars]
+        entity = CarWithArchive if include_archive else Car
+        budget = response_budget(max_bytes, max_tokens)
+        # Current cars are counted and summarized from car_search, without joins
+        summary_entity = CarWithArchive if include_archive else CarSearch
+        if exceeds_budget(db, budget, entity=summary_entity):
+            return {"summary": summarize_cars(db, budget, entity=summary_entity)}, 200
+
+        cars = db.query(entity).join(entity.model).join(Brand).all()
         
-        return {"cars": results}, 200
+        return budgeted_cars_response(db, [serialize_car(car) for car in cars], budget, entity=summary_entity), 200
+
+    except BudgetTooSmallError as e:
+        return {"error": str(e)}, 400
 
     except Exception as e:
         return {"error": str(e)}, 500
@@ -0,0 +1,282 @@
+import numpy as np
+from database.config import get_db
+from database.models import Car, Model, Brand, CarChange, FuelType, TransmissionType
+from utils.sqlalchemy_utils import clean_sqlalchemy_object
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, contains_eager
+from .coalescing import read_coalescer
+
+db = get_db()
+
+NUMERIC_FEATURES = ['price', 'kilometers', 'year', 'engine_displacement', 'consumption']
+FUEL_TYPES = list(FuelType)
+TRANSMISSIONS = list(TransmissionType)
+FEATURE_COUNT = len(NUMERIC_FEATURES) + len(FUEL_TYPES) + len(TRANSMISSIONS)
+
+MAX_K = 100
+
+FEATURE_COLUMNS = [
+    Car.id,
+    Car.price,
+    Car.kilometers,
+    Car.year,
+    Model.engine_displacement,
+    Model.consumption,
+    Model.fuel_type,
+    Model.transmission,
+]
+
+class CarSimilarityIndex:
+    """
+    In-memory nearest neighbour index over the cars' numeric features, standardized
+    with the statistics of the initial build, plus one-hot fuel type and transmission.
+
+    The index is built on first use and then kept up to date from the car change
+    log, so writes from create_car, update_car, delete_car and bulk imports are
+    applied incrementally before each search.
+    """
+
+    def __init__(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        # Stored one feature per row so searches run as fast contiguous dot products
+        self.features = np.empty((FEATURE_COUNT, 0), dtype=np.float32)
+        self.squares = np.empty((FEATURE_COUNT, 0), dtype=np.float32)
+        self.active = np.empty(0, dtype=bool)
+        self.positions: Dict[int, int] = {}
+        self.size = 0
+        self.mean = np.zeros(len(NUMERIC_FEATURES), dtype=np.float32)
+        self.scale = np.ones(len(NUMERIC_FEATURES), dtype=np.float32)
+        self.last_seq: Optional[int] = None
+
+    def build(self, session: Session) -> None:
+        last_seq = session.execute(select(func.coalesce(func.max(CarChange.seq), 0))).scalar()
+
+        numeric_columns = FEATURE_COLUMNS[1:1 + len(NUMERIC_FEATURES)]
+        stats = session.execute(
+            select(
+                *[func.avg(column) for column in numeric_columns],
+                *[func.avg(column * column) for column in numeric_columns]
+            ).select_from(Car).join(Model, Car.model_id == Model.id)
+        ).one()
+        count = len(numeric_columns)
+        mean = np.array([value or 0 for value in stats[:count]], dtype=np.float64)
+        mean_square = np.array([value or 0 for value in stats[count:]], dtype=np.float64)
+        scale = np.sqrt(np.maximum(mean_square - mean * mean, 0))
+        self.mean = mean.astype(np.float32)
+        self.scale = np.where(scale > 0, scale, 1).astype(np.float32)
+
+        result = session.execute(
+            select(*FEATURE_COLUMNS)
+            .join(Model, Car.model_id == Model.id)
+            .execution_options(stream_results=True, yield_per=50000)
+        )
+        for rows in result.partitions():
+            self.upsert_rows(rows)
+
+        self.last_seq = last_seq
+
+    def sync(self, session: Session) -> None:
+        if self.last_seq is None:
+            self.build(session)
+            return
+
+        changes = session.execute(
+            select(CarChange.seq, CarChange.car_id).where(CarChange.seq > self.last_seq).order_by(CarChange.seq)
+        ).all()
+        if not changes:
+            return
+
+        car_ids = {car_id for _, car_id in changes}
+        rows = session.execute(
+            select(*FEATURE_COLUMNS).join(Model, Car.model_id == Model.id).where(Car.id.in_(car_ids))
+        ).all()
+
+        for car_id in car_ids - {row.id for row in rows}:
+            self.remove(car_id)
+        self.upsert_rows(rows)
+        self.last_seq = changes[-1].seq
+
+    def upsert_rows(self, rows: Iterable[Any]) -> None:
+        rows = list(rows)
+        if not rows:
+            return
+
+        positions = np.array([
+            self.positions[row.id] if row.id in self.positions else self.allocate(row.id)
+            for row in rows
+        ])
+
+        numeric = np.array(
+            [[row.price, row.kilometers, row.year, row.engine_displacement, row.consumption] for row in rows],
+            dtype=np.float32
+        )
+        offset = len(NUMERIC_FEATURES)
+        fuel_columns = [offset + FUEL_TYPES.index(row.fuel_type) for row in rows]
+        offset += len(FUEL_TYPES)
+        transmission_columns = [offset + TRANSMISSIONS.index(row.transmission) for row in rows]
+
+        vectors = np.zeros((len(rows), FEATURE_COUNT), dtype=np.float32)
+        vectors[:, :len(NUMERIC_FEATURES)] = (numeric - self.mean) / self.scale
+        vectors[np.arange(len(rows)), fuel_columns] = 1
+        vectors[np.arange(len(rows)), transmission_columns] = 1
+
+        self.features[:, positions] = vectors.T
+        self.squares[:, positions] = (vectors * vectors).T
+        self.active[positions] = True
+
+    def allocate(self, car_id: int) -> int:
+        if self.size == len(self.ids):
+            capacity = max(1024, self.size * 2)
+            self.ids = np.resize(self.ids, capacity)
+            self.features = resize_columns(self.features, capacity)
+            self.squares = resize_columns(self.squares, capacity)
+            self.active = np.resize(self.active, capacity)
+            self.active[self.size:] = False
+
+        position = self.size
+        self.ids[position] = car_id
+        self.positions[car_id] = position
+        self.size += 1
+        return position
+
+    def remove(self, car_id: int) -> None:
+        position = self.positions.get(car_id)
+        if position is not None:
+            self.active[position] = False
+
+    def encode(self, attributes: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Encode car attributes as a feature vector and a mask of the features given.
+
+        Raises:
+            ValueError: If an attribute has an invalid value
+        """
+        vector = np.zeros(FEATURE_COUNT, dtype=np.float32)
+        mask = np.zeros(FEATURE_COUNT, dtype=np.float32)
+
+        for index, name in enumerate(NUMERIC_FEATURES):
+            if attributes.get(name) is not None:
+                vector[index] = (float(attributes[name]) - self.mean[index]) / self.scale[index]
+                mask[index] = 1
+
+        offset = len(NUMERIC_FEATURES)
+        for name, enum_type, members in (('fuel_type', FuelType, FUEL_TYPES), ('transmission', TransmissionType, TRANSMISSIONS)):
+            value = attributes.get(name)
+            if value is not None:
+                value = enum_type(value.value if isinstance(value, enum_type) else str(value).lower())
+                vector[offset + members.index(value)] = 1
+                mask[offset:offset + len(members)] = 1
+            offset += len(members)
+
+        return vector, mask
+
+    def search(self, vector: np.ndarray, mask: np.ndarray, k: int, exclude_id: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Find the k active cars closest to vector, comparing only the masked features.
+
+        Returns:
+            list: Tuples of car id and distance, closest first
+        """
+        size = self.size
+        weighted = vector * mask
+        # Squared euclidean distance expanded as |x|^2 - 2 x.v + |v|^2 over the masked features
+        distances = mask @ self.squares[:, :size] - 2 * (weighted @ self.features[:, :size]) + float(weighted @ vector)
+        distances[~self.active[:size]] = np.inf
+        if exclude_id is not None and exclude_id in self.positions:
+            distances[self.positions[exclude_id]] = np.inf
+
+        k = min(k, int(np.count_nonzero(np.isfinite(distances))))
+        if k == 0:
+            return []
+
+        nearest = np.argpartition(distances, k - 1)[:k]
+        nearest = nearest[np.argsort(distances[nearest])]
+        return [(int(self.ids[i]), float(np.sqrt(max(distances[i], 0)))) for i in nearest]
+
+def resize_columns(array: np.ndarray, capacity: int) -> np.ndarray:
+    resized = np.zeros((array.shape[0], capacity), dtype=array.dtype)
+    resized[:, :array.shape[1]] = array
+    return resized
+
+similarity_index = CarSimilarityIndex()
+
+@read_coalescer.coalesce
+async def find_similar_cars(car_id: Optional[int] = None, attributes: Optional[Dict[str, Any]] = None, k: int = 5) -> Tuple[Dict[str, Any], int]:
+    """
+    Find the cars most similar to a given car or to a set of attributes.
+
+    Similarity is measured over price, kilometers, year, engine_displacement and
+    consumption (standardized) plus fuel_type and transmission.
+
+    Args:
+        car_id (int, optional): ID of the car to find similar cars to
+        attributes (dict, optional): Attributes to find similar cars to, used when car_id is not given:
+            - price (float, optional): Price of the car
+            - kilometers (int, optional): Kilometers of the car
+            - year (int, optional): Year of the car
+            - engine_displacement (float, optional): Engine displacement
+            - consumption (float, optional): Fuel consumption
+            - fuel_type (gasoline, ethanol, diesel, flex, hybrid, electric, optional): Type of fuel
+            - transmission (manual, automatic, semi_automatic, cvt, optional): Type of transmission
+        k (int): Number of similar cars to return (1 to 100)
+
+    Returns:
+        tuple: A tuple containing:
+            - dict: Response with similar cars, each with its distance, or error message
+            - int: HTTP status code (200 for success, 400 for bad request, 404 for not found, 500 for server error)
+    """
+    try:
+        if car_id is None and not attributes:
+            return {"error": "Either car_id or attributes must be provided"}, 400
+        if k < 1 or k > MAX_K:
+            return {"error": f"k must be between 1 and {MAX_K}"}, 400
+
+        similarity_index.sync(db)
+
+        if car_id is not None:
+            position = similarity_index.positions.get(car_id)
+            if position is None or not similarity_index.active[position]:
+                db.rollback()
+                return {"error": "Car not found"}, 404
+            vector = similarity_index.features[:, position]
+            mask = np.ones(FEATURE_COUNT, dtype=np.float32)
+        else:
+            try:
+                vector, mask = similarity_index.encode(attributes)
+            except ValueError as e:
+                db.rollback()
+                return {"error": f"Invalid attributes: {e}"}, 400
+            if not mask.any():
+                db.rollback()
+                return {"error": f"attributes must include at least one of: {', '.join(NUMERIC_FEATURES + ['fuel_type', 'transmission'])}"}, 400
+
+        nearest = similarity_index.search(vector, mask, k, exclude_id=car_id)
+        distances = dict(nearest)
+
+        cars = db.execute(
+            select(Car)
+            .join(Model)
+            .join(Brand)
+            .options(contains_eager(Car.model).contains_eager(Model.brand))
+            .where(Car.id.in_(distances))
+            .execution_options(populate_existing=True)
+        ).scalars().all()
+
+        results = sorted([{
+            **clean_sqlalchemy_object(car),
+            "model": {
+                **clean_sqlalchemy_object(car.model),
+                "brand": clean_sqlalchemy_object(car.model.brand)
+            },
+            "distance": round(distances[car.id], 4)
+        } for car in cars], key=lambda car: car["distance"])
+
+        # End the read transaction so the next sync sees changes committed since
+        db.rollback()
+
+        return {"cars": results}, 200
+
+    except Exception as e:
+        db.rollback()
+        return {"error": str(e)}, 500
@@ -0,0 +1,195 @@
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+from typing import List
+
+from dotenv import load_dotenv
+
+WORKER_START_TIMEOUT = 60
+WORKER_STOP_TIMEOUT = 30
+RESTART_BACKOFF_INITIAL = 1
+RESTART_BACKOFF_MAX = 30
+MAX_RESTARTS = 5
+# A restarted worker that stays up this long is considered healthy again
+RESTART_RESET_AFTER = 300
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """
+    Open a listening socket with SO_REUSEPORT, so every worker binds the same port
+    and the kernel spreads incoming connections between them.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(index: int, host: str, port: int, log_level: str, ready) -> None:
+    """
+    Serve the MCP tools from one worker process.
+
+    Workers are spawned, not forked, so each one imports the tools itself and owns
+    its engine, connection pool, sessions and in-memory caches. Nothing is shared
+    between workers but the port.
+    """
+    # Leave signal handling to the supervisor, so a terminal Ctrl+C is delivered once
+    os.setpgrp()
+
+    import uvicorn
+    from database.config import engine
+    from server import server
+
+    # Stateless requests carry no session, so any worker can answer any request
+    server.settings.stateless_http = True
+    server.settings.json_response = True
+    logging.getLogger().setLevel(log_level.upper())
+
+    class WorkerServer(uvicorn.Server):
+        async def startup(self, sockets=None):
+            await super().startup(sockets)
+            if not self.should_exit:
+                ready.set()
+
+        async def shutdown(self, sockets=None):
+            # Runs before uvicorn re-raises the stop signal, which ends the process
+            await super().shutdown(sockets)
+            engine.dispose()
+            print(f"Worker {index} (pid {os.getpid()}) stopped", flush=True)
+
+    sock = bind_socket(host, port)
+    config = uvicorn.Config(
+        server.streamable_http_app(),
+        log_level=log_level,
+        timeout_graceful_shutdown=WORKER_STOP_TIMEOUT
+    )
+    # uvicorn stops accepting connections on SIGTERM/SIGINT and lets in-flight requests finish
+    WorkerServer(config).run(sockets=[sock])
+
+
+def start_worker(context, index: int, host: str, port: int, log_level: str):
+    ready = context.Event()
+    process = context.Process(target=run_worker, args=(index, host, port, log_level, ready), name=f"mcp-worker-{index}")
+    process.start()
+    return process, ready
+
+
+def wait_ready(process: multiprocessing.Process, ready) -> bool:
+    deadline = time.monotonic() + WORKER_START_TIMEOUT
+    while time.monotonic() < deadline and process.is_alive():
+        if ready.wait(0.1):
+            return True
+    return False
+
+
+def stop_workers(processes: List[multiprocessing.Process]) -> None:
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+    deadline = time.monotonic() + WORKER_STOP_TIMEOUT + 5
+    for process in processes:
+        process.join(max(0, deadline - time.monotonic()))
+        if process.is_alive():
+            print(f"Worker {process.name} did not stop in time, killing it", flush=True)
+            process.kill()
+            process.join()
+
+
+def serve(workers: int, host: str, port: int, log_level: str = "info") -> int:
+    """
+    Start the workers, wait until all of them accept connections, then supervise
+    them until SIGTERM or SIGINT, restarting any worker that exits unexpectedly.
+
+    Restarts are delayed with an exponential backoff, and the supervisor gives up
+    when a worker exits MAX_RESTARTS times in a row without staying up for
+    RESTART_RESET_AFTER seconds.
+
+    Returns:
+        int: Process exit code
+    """
+    if not hasattr(socket, "SO_REUSEPORT"):
+        print("SO_REUSEPORT is not supported on this platform, run server.py instead", file=sys.stderr)
+        return 1
+
+    context = multiprocessing.get_context("spawn")
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    started = time.perf_counter()
+    workers_state = [start_worker(context, index, host, port, log_level) for index in range(workers)]
+    for index, (process, ready) in enumerate(workers_state):
+        if not wait_ready(process, ready):
+            print(f"Worker {index} failed to start", file=sys.stderr, flush=True)
+            stop_workers([process for process, _ in workers_state])
+            return 1
+    print(f"{workers} workers listening on {host}:{port} (started in {time.perf_counter() - started:.2f}s)", flush=True)
+
+    restarts = [0] * workers
+    up_since = [time.monotonic()] * workers
+    restart_at = [None] * workers
+    while not stopping:
+        time.sleep(0.5)
+        for index, (process, ready) in enumerate(workers_state):
+            if stopping:
+                break
+            now = time.monotonic()
+            if process.is_alive():
+                if restarts[index] and now - up_since[index] > RESTART_RESET_AFTER:
+                    restarts[index] = 0
+                continue
+
+            if restart_at[index] is None:
+                if restarts[index] >= MAX_RESTARTS:
+                    print(f"Worker {index} exited with code {process.exitcode} after {MAX_RESTARTS} restarts, giving up", file=sys.stderr, flush=True)
+                    stop_workers([process for process, _ in workers_state])
+                    return 1
+                delay = min(RESTART_BACKOFF_MAX, RESTART_BACKOFF_INITIAL * 2 ** restarts[index])
+                print(f"Worker {index} exited with code {process.exitcode}, restarting it in {delay}s", flush=True)
+                restart_at[index] = now + delay
+            elif now >= restart_at[index]:
+                restart_at[index] = None
+                restarts[index] += 1
+                process, ready = workers_state[index] = start_worker(context, index, host, port, log_level)
+                if wait_ready(process, ready):
+                    up_since[index] = time.monotonic()
+                    print(f"Worker {index} restarted (attempt {restarts[index]} of {MAX_RESTARTS})", flush=True)
+                else:
+                    # Stop a worker stuck in startup, so the next round retries it with a longer delay
+                    print(f"Worker {index} failed to start after a restart", file=sys.stderr, flush=True)
+                    stop_workers([process])
+
+    print("Stopping workers", flush=True)
+    stop_workers([process for process, _ in workers_state])
+    return 0
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Run the MCP server as several worker processes sharing one port")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("MCP_SERVER_WORKERS", os.cpu_count() or 1)), help="Number of worker processes, the number of cores by default")
+    parser.add_argument("--host", default="0.0.0.0", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=int(os.getenv("MCP_SERVER_PORT", 80)), help="Port shared by the workers")
+    parser.add_argument("--log-level", choices=["debug", "info", "warning", "error", "critical"], default="info", help="Log level of the workers")
+    args = parser.parse_args()
+
+    sys.exit(serve(args.workers, args.host, args.port, args.log_level))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,5 +4,6 @@ echo "Installing dependencies..."
 
 alembic upgrade head
 python database/seed.py
+python database/car_search.py rebuild
 
 echo "Setup completed"
\ No newline at end of file
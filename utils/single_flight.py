@@ -0,0 +1,78 @@
+import asyncio
+import functools
+import inspect
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls of async tools made with the same arguments, so they
+    share one in-flight execution and get the same result.
+
+    The wrapped tools run their database work synchronously, so each execution is
+    moved to a worker thread to let identical calls arrive while it is in flight.
+    Each tool gets its own single-thread executor: executions of the same tool are
+    serialized, as each tool module uses a single session, and queue without
+    holding a thread, so a burst of calls to one tool cannot starve the others.
+    """
+
+    def __init__(self):
+        self.in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self.executors: Dict[str, ThreadPoolExecutor] = {}
+        self.calls: Dict[str, int] = {}
+        self.executions: Dict[str, int] = {}
+
+    def coalesce(self, func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        name = func.__name__
+        signature = inspect.signature(func)
+        self.executors[name] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"single-flight-{name}")
+        self.calls[name] = 0
+        self.executions[name] = 0
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (name, normalize_arguments(bound.arguments))
+
+            self.calls[name] += 1
+            future = self.in_flight.get(key)
+            if future is None:
+                self.executions[name] += 1
+                future = asyncio.get_running_loop().run_in_executor(self.executors[name], self.execute, func, args, kwargs)
+                self.in_flight[key] = future
+                future.add_done_callback(lambda _: self.in_flight.pop(key, None))
+
+            # Shield the shared execution so a cancelled caller does not cancel it for the others
+            return await asyncio.shield(future)
+
+        return wrapper
+
+    def execute(self, func: Callable[..., Awaitable[Any]], args: tuple, kwargs: dict) -> Any:
+        return asyncio.run(func(*args, **kwargs))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "calls": self.calls[name],
+                "executions": self.executions[name],
+                "coalesced": self.calls[name] - self.executions[name],
+                "in_flight": sum(1 for tool, _ in self.in_flight if tool == name),
+            }
+            for name in self.calls
+        }
+
+
+def normalize_arguments(arguments: Dict[str, Any]) -> str:
+    """
+    Serialize tool arguments into a canonical string, ignoring key order and unset
+    fields of Pydantic models.
+    """
+    def default(value):
+        if hasattr(value, "model_dump"):
+            return value.model_dump(mode="json", exclude_none=True)
+        return str(value)
+
+    return json.dumps(arguments, default=default, sort_keys=True)
@@ -1,3 +1,6 @@
+from sqlalchemy.sql.elements import BindParameter
+
+
 def clean_sqlalchemy_object(obj):
     """
     Clean SQLAlchemy object by removing internal attributes and converting to a clean dictionary.
@@ -28,4 +31,8 @@ def add_range_condition(conditions: list, min_value: any, max_value: any, field:
 
 def add_text_search_condition(conditions: list, value: str, field: any) -> None:
     if value is not None:
-        conditions.append(field.ilike(f"%{value}%"))
+        pattern = value if isinstance(value, BindParameter) else text_search_pattern(value)
+        conditions.append(field.ilike(pattern))
+
+def text_search_pattern(value: str) -> str:
+    return f"%{value}%"
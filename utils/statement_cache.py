@@ -0,0 +1,75 @@
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.default import CACHE_HIT
+from sqlalchemy.sql import Executable
+
+
+class StatementCache:
+    """
+    Cache of prebuilt statements keyed on the shape of a query, so callers only
+    supply bind parameter values on each execution.
+
+    Every statement handed out is tagged with the ``statement_cache`` execution
+    option; executions on ``engine`` carrying that tag are recorded so the hit
+    rate of SQLAlchemy's compiled cache can be reported next to our own.
+
+    Args:
+        name (str): Name used to tag the statements built by this cache
+        builder (callable): Function receiving a shape and returning a statement
+        engine (Engine): Engine whose executions are tracked
+    """
+
+    def __init__(self, name: str, builder: Callable[[Hashable], Executable], engine: Engine):
+        self.name = name
+        self.builder = builder
+        self.statements: Dict[Hashable, Executable] = {}
+        self.hits = 0
+        self.misses = 0
+        self.compiled_hits = 0
+        self.compiled_misses = 0
+        self._lock = Lock()
+
+        event.listen(engine, "after_cursor_execute", self._record_execution)
+
+    def get(self, shape: Hashable) -> Executable:
+        with self._lock:
+            statement = self.statements.get(shape)
+            if statement is not None:
+                self.hits += 1
+                return statement
+
+            self.misses += 1
+            statement = self.builder(shape).execution_options(statement_cache=self.name)
+            self.statements[shape] = statement
+            return statement
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "shapes": len(self.statements),
+                "statement_cache": _rate(self.hits, self.misses),
+                "compiled_cache": _rate(self.compiled_hits, self.compiled_misses),
+            }
+
+    def _record_execution(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if context is None or context.execution_options.get("statement_cache") != self.name:
+            return
+
+        with self._lock:
+            if context.cache_hit == CACHE_HIT:
+                self.compiled_hits += 1
+            else:
+                self.compiled_misses += 1
+
+
+def _rate(hits: int, misses: int) -> Dict[str, Any]:
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 4) if total else None,
+    }